@@ -1,20 +1,91 @@
 # pip install crossbarhttp3
 from crossbarhttp import Client
+import requests
+from requests.adapters import HTTPAdapter
+import atexit
+import queue
+import threading
 import time
 import datetime
 import inspect
 import json
 # with open('config.json') as config_file:
 #     config_data = json.load(config_file)
-client = Client("http://aws_rasa.hertzai.com:8088/publish")
+
+# One keep-alive session for every publish so repeated calls reuse the same
+# TCP/TLS connection instead of opening a new one per request.
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, pool_block=False))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, pool_block=False))
+_SESSION.headers.update({"Connection": "keep-alive"})
+
+
+class PooledClient(Client):
+    """crossbarhttp Client that posts through the shared requests session."""
+
+    def _make_api_call(self, method, url, json_params=None):
+        if self.key is not None and self.secret is not None:
+            # Signed requests need the query string built by the base client
+            return super()._make_api_call(method, url, json_params=json_params)
+        self.sequence += 1
+        response = _SESSION.request(method, url, json=json_params, timeout=5)
+        response.raise_for_status()
+        return response.json()
+
+
+client = PooledClient("http://aws_rasa.hertzai.com:8088/publish")
 vm_name = 'general_purpose'
 service = 'chatbot'
 file_name = 'chatbot.py'
  
  
+TOPIC = "com.hertzai.hevolve.action"
+QUEUE_MAX = 1024
+EXIT_DRAIN_TIMEOUT = 5.0  # seconds to keep publishing at exit before giving up
+
+_queue = queue.Queue(maxsize=QUEUE_MAX)
+
+
+def _drain():
+    # One event per publish keeps the payload subscribers expect; the pooled
+    # session already makes back-to-back posts cheap
+    while True:
+        message = _queue.get()
+        try:
+            client.publish(TOPIC, message)
+        except Exception as e:
+            print(f"exception_publish failed: {e}")
+        finally:
+            _queue.task_done()
+
+
+def _drain_at_exit():
+    """Give queued events a bounded chance to go out, then abandon the rest."""
+    deadline = time.monotonic() + EXIT_DRAIN_TIMEOUT
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.05)
+    if _queue.unfinished_tasks:
+        print(f"exception_publish: dropping {_queue.unfinished_tasks} unsent event(s) at exit")
+
+
+threading.Thread(target=_drain, name="exception-publisher", daemon=True).start()
+# Deliver what we can before the interpreter exits, without hanging on a
+# crossbar that is down (every publish can take its full HTTP timeout)
+atexit.register(_drain_at_exit)
+
+
 def exception_publish(message):
-    result = client.publish(
-        "com.hertzai.hevolve.action", message)
+    """Queue message for the background publisher and return immediately."""
+    try:
+        _queue.put_nowait(message)
+    except queue.Full:
+        # Drop the oldest event rather than block the caller
+        try:
+            _queue.get_nowait()
+            _queue.task_done()
+        except queue.Empty:
+            pass
+        _queue.put_nowait(message)
 
 inp = {
             'parent_request_id': 'sommereqeuestidhere',
@@ -28,4 +99,4 @@ inp = {
         }
 exception_publish(inp)
  
- 
\ No newline at end of file
+ 
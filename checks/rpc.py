@@ -1,9 +1,23 @@
 """rpc.py"""
 from autobahn.twisted.wamp import ApplicationSession, ApplicationRunner
+from autobahn.wamp.serializer import SERID_TO_SER
 from twisted.internet.defer import inlineCallbacks
+import logging
 import traceback
+import wamp_json
+
+logger = logging.getLogger(__name__)
+
+EXCEPTION_TOPIC = "com.hertzai.hevolve.action"
+# handleAction expects the action as a keyword argument
+ACTION_KWARGS = {"action": "execute_instruction"}
  
 class OmniToolClient(ApplicationSession):
+    def exception_publish(self, message):
+        # Publish over the already-open WAMP session instead of the HTTP bridge;
+        # without acknowledge this returns immediately after queueing the frame.
+        self.publish(EXCEPTION_TOPIC, message)
+
     @inlineCallbacks
     def onJoin(self, details):
         print("Connected to WebSocket")
@@ -37,17 +51,19 @@ class OmniToolClient(ApplicationSession):
             # - prompt_id in args[0] object 
             # - action in kwargs
             action_payload = [{"prompt_id": prompt_id}]
-            action_kwargs = {"action": "execute_instruction"}
             
             response2 = yield self.call(user_specific_uri, 
                                        *action_payload,  # Unpack list as positional args
-                                       **action_kwargs)  # Unpack dict as keyword args
+                                       **ACTION_KWARGS)  # Unpack dict as keyword args
             
             print(f"User-specific RPC Response: {response2}")
             
         except Exception as e:
-            print(f"RPC call failed: {e}")
-            traceback.print_exc()
+            print("RPC call failed:", traceback.format_exception_only(type(e), e)[-1].strip())
+            if logger.isEnabledFor(logging.DEBUG):
+                # Full stack formatting is only worth paying for when debugging
+                logger.debug("trace:", exc_info=True)
+            self.exception_publish(dict(payload, error=str(e)))
  
         self.leave()
  
@@ -57,9 +73,18 @@ class OmniToolClient(ApplicationSession):
         reactor.stop()
  
 if __name__ == "__main__":
+    # Use orjson for the JSON fallback serializer when available
+    wamp_json.install()
+
     # Connect to the WebSocket server
     websocket_url = "wss://azurekong.hertzai.com:8445/wss"  # Replace with actual URL
     realm = "realm1"  # Replace with actual realm
    
-    runner = ApplicationRunner(websocket_url, realm)
+    # Flush each small RPC frame immediately rather than waiting on Nagle
+    websocket_options = {"tcpNoDelay": True}
+    # Offer binary serializers first; JSON stays as the fallback
+    serializers = [SERID_TO_SER[name]() for name in ("msgpack", "cbor", "json") if name in SERID_TO_SER]
+
+    runner = ApplicationRunner(websocket_url, realm, serializers=serializers,
+                               websocket_options=websocket_options)
     runner.run(OmniToolClient)
\ No newline at end of file
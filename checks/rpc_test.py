@@ -5,23 +5,34 @@ RPC Procedure Test Script
 This script tests if a specific RPC procedure is registered and working
 on a WAMP router. It attempts to:
 1. Connect to the WAMP router
-2. Check if procedures are registered
-3. Call the procedures with test data
-4. Report detailed results
+2. Call the procedures with test data
+3. Report detailed results (including procedures that are not registered)
 
 Usage:
-python rpc_test.py
+pip install wsaccel  # optional, C-accelerated WebSocket masking/UTF-8 validation
+python rpc_test.py         # keep the session open and rerun the tests periodically
+python rpc_test.py --once  # run the tests once and disconnect
 """
 
 import sys
 import time
+import argparse
+import os
+import socket
 import logging
-import uuid
 from twisted.internet import reactor
-from twisted.internet.defer import inlineCallbacks
+from twisted.internet.defer import inlineCallbacks, ensureDeferred, DeferredList
+from twisted.internet.task import LoopingCall
 from autobahn.twisted.component import Component
 from autobahn.twisted.wamp import ApplicationSession
+from autobahn.twisted.websocket import WampWebSocketClientProtocol
+from autobahn.websocket.compress import PerMessageDeflateOffer, PerMessageDeflateResponseAccept
 from autobahn.wamp.types import CallOptions
+from autobahn.wamp.exception import ApplicationError
+from autobahn.wamp.serializer import SERID_TO_SER
+from autobahn.websocket.utf8validator import Utf8Validator
+from autobahn.websocket.xormasker import XorMaskerNull
+import wamp_json
 
 # Configure logging
 logging.basicConfig(
@@ -37,8 +48,83 @@ REALM = "realm1"
 USER_ID = "00000" # Enter your user ID here
 PROMPT_ID = "54"
 
+# Prefer binary serializers (screenshots come back as raw bytes) and fall back
+# to JSON when msgpack/cbor2 are not installed or the router refuses them
+SERIALIZERS = [name for name in ("msgpack", "cbor", "json") if name in SERID_TO_SER]
+
 # Test parameters
 TEST_TIMEOUT = 10  # seconds
+RERUN_INTERVAL = 30  # seconds between runs when the session is kept open
+CALL_OPTIONS = CallOptions(timeout=TEST_TIMEOUT)
+
+# Procedures to test; each call also gets the run's request_id as a kwarg
+PROCEDURES = (
+    {
+        "name": sys.intern(f"com.hertzai.hevolve.action.{PROMPT_ID}.{USER_ID}.win_exec"),
+        "args": ("python", "-c", "import pyautogui; pyautogui.FAILSAFE = False; pyautogui.moveTo(112, 22)"),
+    },
+    {
+        "name": sys.intern(f"com.hertzai.hevolve.action.{PROMPT_ID}.{USER_ID}.win_screenshot"),
+        "args": (),
+        # Image bytes are streamed back as progressive results
+        "progressive": True
+    },
+)
+
+
+class _IdPool:
+    """Tracing IDs sliced from one pre-drawn entropy buffer (not for security use)."""
+
+    BUFFER_SIZE = 4096
+    ID_BYTES = 16
+
+    def __init__(self):
+        self._buf = os.urandom(self.BUFFER_SIZE)
+        self._i = 0
+
+    def next(self):
+        if self._i + self.ID_BYTES > self.BUFFER_SIZE:
+            self._buf = os.urandom(self.BUFFER_SIZE)
+            self._i = 0
+        request_id = self._buf[self._i:self._i + self.ID_BYTES].hex()
+        self._i += self.ID_BYTES
+        return request_id
+
+
+_IDS = _IdPool()
+
+
+COMPRESSION_THRESHOLD = 1024  # bytes; smaller messages are sent uncompressed
+
+_send_message = WampWebSocketClientProtocol.sendMessage
+
+
+def _send_message_above_threshold(self, payload, isBinary=False, fragmentSize=None, sync=False, doNotCompress=False):
+    # Deflating ~100 byte control messages only adds latency; keep it for screenshots
+    doNotCompress = doNotCompress or len(payload) < COMPRESSION_THRESHOLD
+    return _send_message(self, payload, isBinary, fragmentSize, sync, doNotCompress)
+
+
+WampWebSocketClientProtocol.sendMessage = _send_message_above_threshold
+
+
+SOCKET_BUFFER_SIZE = 1 << 20  # bytes; room for a screenshot result in flight
+
+_connection_made = WampWebSocketClientProtocol.connectionMade
+
+
+def _connection_made_with_buffers(self):
+    # Larger kernel buffers keep a multi-MB screenshot flowing over high-latency links
+    try:
+        sock = self.transport.getHandle()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+    except (AttributeError, OSError) as e:
+        logger.debug(f"Could not resize socket buffers: {e}")
+    return _connection_made(self)
+
+
+WampWebSocketClientProtocol.connectionMade = _connection_made_with_buffers
 
 
 class TestSession(ApplicationSession):
@@ -46,90 +132,87 @@ class TestSession(ApplicationSession):
 
     async def onJoin(self, details):
         logger.info(f"Session joined with details: {details}")
-        
+
+        if self.config.extra.get("once"):
+            await self.run_procedures()
+            # We're done testing - leave the session
+            logger.info("Tests completed, leaving session...")
+            self.leave()
+        else:
+            # Rerun on the same session so each run skips the TLS and WAMP handshakes
+            self._rerun = LoopingCall(lambda: ensureDeferred(self.run_procedures()))
+            self._rerun.start(RERUN_INTERVAL)
+
+    async def run_procedures(self):
+        """Check and call every test procedure once on the current session."""
         # Create a request ID for tracing
-        request_id = str(uuid.uuid4())
+        request_id = _IDS.next()
         logger.info(f"Using request ID: {request_id}")
         
-        # Define procedures to test
-        procedures = [
-            {
-                "name": f"com.hertzai.hevolve.action.{PROMPT_ID}.{USER_ID}.win_exec",
-                "args": ["python", "-c", "import pyautogui; pyautogui.FAILSAFE = False; pyautogui.moveTo(112, 22)"],
-                "kwargs": {"request_id": request_id}
-            },
-            {
-                "name": f"com.hertzai.hevolve.action.{PROMPT_ID}.{USER_ID}.win_screenshot",
-                "args": [],
-                "kwargs": {"request_id": request_id}
-            }
-        ]
-        
-        for proc in procedures:
-            procedure_name = proc["name"]
-            logger.info(f"Testing procedure: {procedure_name}")
-            
+        # Calls are independent, so let them overlap on the one WebSocket
+        await DeferredList([ensureDeferred(self._test_one(proc, request_id)) for proc in PROCEDURES],
+                           consumeErrors=True)
+
+        logger.info("Test run completed")
+
+    async def _test_one(self, proc, request_id):
+        """Call a single procedure and log a summary of its result."""
+        procedure_name = proc["name"]
+        kwargs = {"request_id": request_id}
+        logger.info(f"Testing procedure: {procedure_name}")
+
+        try:
+            # Now try to call the procedure
+            logger.info(f"Calling procedure {procedure_name} with args={proc['args']}, kwargs={kwargs}")
+
+            options = CALL_OPTIONS
+            chunks = bytearray()
+            if proc.get("progressive"):
+                # Assemble streamed chunks as they arrive instead of one large result
+                options = CallOptions(timeout=TEST_TIMEOUT, on_progress=chunks.extend)
+
             try:
-                # First test if procedure exists by trying to register it ourselves
-                # (This will fail with a registration error if it already exists)
-                try:
-                    logger.info(f"Checking if {procedure_name} is already registered...")
-                    
-                    # Define a dummy handler
-                    async def dummy_handler(*args, **kwargs):
-                        return "Dummy response"
-                    
-                    # Try to register it (should fail if procedure exists)
-                    reg = await self.register(dummy_handler, procedure_name)
-                    
-                    # If we got here, procedure doesn't exist
-                    logger.warning(f"Procedure {procedure_name} is NOT registered on the router!")
-                    
-                    # Unregister our dummy handler
-                    await reg.unregister()
-                except Exception as e:
-                    if "wamp.error.procedure_already_exists" in str(e):
-                        logger.info(f"Procedure {procedure_name} is already registered (good).")
-                    else:
-                        logger.error(f"Unexpected error checking procedure registration: {e}")
-                
-                # Now try to call the procedure
-                logger.info(f"Calling procedure {procedure_name} with args={proc['args']}, kwargs={proc['kwargs']}")
-                
-                try:
-                    # Set timeout for the call
-                    options = CallOptions(timeout=TEST_TIMEOUT)
-                    
-                    # Make the actual call
-                    start_time = time.time()
-                    result = await self.call(procedure_name, *proc["args"], options=options, **proc["kwargs"])
-                    elapsed_time = time.time() - start_time
-                    
-                    # Process the result
-                    logger.info(f"Call succeeded in {elapsed_time:.2f}s!")
-                    logger.info(f"Result type: {type(result)}")
-                    
-                    # Summarize the result based on its type
-                    if isinstance(result, dict):
-                        logger.info(f"Result keys: {list(result.keys())}")
-                        if 'status' in result:
-                            logger.info(f"Status: {result['status']}")
-                        if 'output' in result:
-                            logger.info(f"Output (truncated): {str(result['output'])[:200]}...")
-                    elif isinstance(result, bytes):
-                        logger.info(f"Received binary data of length: {len(result)} bytes")
-                    else:
-                        logger.info(f"Result (truncated): {str(result)[:200]}...")
-                    
-                except Exception as e:
-                    logger.error(f"Error calling procedure {procedure_name}: {e}")
-            
+                # Make the actual call
+                start_time = time.time()
+                result = await self.call(procedure_name, *proc["args"], options=options, **kwargs)
+                elapsed_time = time.time() - start_time
+
+                # Process the result
+                logger.info(f"Call succeeded in {elapsed_time:.2f}s!")
+                logger.info(f"Result type: {type(result)}")
+
+                # Summarize the result based on its type
+                if chunks:
+                    logger.info(f"Received streamed binary data of length: {len(chunks)} bytes")
+                if isinstance(result, dict):
+                    logger.info(f"Result keys: {list(result.keys())}")
+                    if 'status' in result:
+                        logger.info(f"Status: {result['status']}")
+                    if 'output' in result:
+                        logger.info(f"Output (truncated): {str(result['output'])[:200]}...")
+                elif isinstance(result, bytes):
+                    # Callee does not stream progressive results
+                    logger.info(f"Received binary data of length: {len(result)} bytes")
+                else:
+                    logger.info(f"Result (truncated): {str(result)[:200]}...")
+
+            except ApplicationError as e:
+                # The call itself tells us whether anything is registered
+                if e.error == ApplicationError.NO_SUCH_PROCEDURE:
+                    logger.warning("Procedure %s is NOT registered on the router!", procedure_name)
+                else:
+                    logger.error("Error calling procedure %s: %s", procedure_name, e)
             except Exception as e:
-                logger.error(f"Overall error testing procedure {procedure_name}: {e}")
-                
-        # We're done testing - leave the session
-        logger.info("Tests completed, leaving session...")
-        self.leave()
+                logger.error("Error calling procedure %s: %s", procedure_name, e)
+
+        except Exception as e:
+            logger.error("Overall error testing procedure %s: %s", procedure_name, e)
+
+    def onLeave(self, details):
+        rerun = getattr(self, "_rerun", None)
+        if rerun is not None and rerun.running:
+            rerun.stop()
+        super().onLeave(details)
 
     def onDisconnect(self):
         logger.info("Session disconnected")
@@ -138,17 +221,41 @@ class TestSession(ApplicationSession):
 
 def main():
     """Main function to run the tests."""
+    parser = argparse.ArgumentParser(description="Test WAMP RPC procedures")
+    parser.add_argument("--once", action="store_true",
+                        help="run the tests once and leave the session")
+    args = parser.parse_args()
+
     logger.info("Starting RPC procedure test")
     logger.info(f"Connecting to {WEBSOCKET_URL}, realm {REALM}")
 
+    # autobahn silently falls back to pure Python when wsaccel is missing
+    if XorMaskerNull.__module__.startswith("wsaccel") and Utf8Validator.__module__.startswith("wsaccel"):
+        logger.info("Using wsaccel for WebSocket masking and UTF-8 validation")
+    else:
+        logger.warning("wsaccel not installed, using pure Python WebSocket masking/UTF-8 validation")
+
+    if wamp_json.install():
+        logger.info("Using orjson for WAMP JSON serialization")
+
     # Create a Component with our test session
     component = Component(
         transports=[{
             "type": "websocket",
             "url": WEBSOCKET_URL,
-            "serializers": ["json"]
+            "serializers": SERIALIZERS,
+            "options": {
+                # Send each small RPC frame immediately rather than waiting on Nagle
+                "tcpNoDelay": True,
+                # Offer permessage-deflate; small messages skip it (see COMPRESSION_THRESHOLD)
+                "perMessageCompressionOffers": [
+                    PerMessageDeflateOffer(accept_no_context_takeover=True, accept_max_window_bits=True)
+                ],
+                "perMessageCompressionAccept": lambda response: PerMessageDeflateResponseAccept(response)
+            }
         }],
         realm=REALM,
+        extra={"once": args.once},
         session_factory=TestSession
     )
 
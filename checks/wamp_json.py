@@ -0,0 +1,69 @@
+"""wamp_json.py
+
+Swap autobahn's WAMP JSON codec for orjson when it is installed.
+
+autobahn's stdlib codec decodes through the pure-Python JSON scanner so it can
+turn "\\0"-prefixed base64 strings back into bytes; orjson does the parsing in
+C and the binary strings are restored in a single pass afterwards.
+
+Usage:
+pip install orjson
+import wamp_json; wamp_json.install()  # before connecting
+"""
+
+import base64
+import decimal
+
+from autobahn.wamp import serializer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_stdlib_loads = serializer._loads
+_stdlib_dumps = serializer._dumps
+
+
+def _default(obj):
+    if isinstance(obj, bytes):
+        return '\x00' + base64.b64encode(obj).decode('ascii')
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _restore_binary(value):
+    if isinstance(value, str):
+        if value and value[0] == '\x00':
+            return base64.b64decode(value[1:])
+        return value
+    if isinstance(value, list):
+        return [_restore_binary(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _restore_binary(item) for key, item in value.items()}
+    return value
+
+
+def _loads(s, use_binary_hex_encoding=False, use_decimal_from_str=False, use_decimal_from_float=False):
+    if use_binary_hex_encoding or use_decimal_from_str or use_decimal_from_float:
+        return _stdlib_loads(s,
+                             use_binary_hex_encoding=use_binary_hex_encoding,
+                             use_decimal_from_str=use_decimal_from_str,
+                             use_decimal_from_float=use_decimal_from_float)
+    return _restore_binary(orjson.loads(s))
+
+
+def _dumps(obj, use_binary_hex_encoding=False):
+    if use_binary_hex_encoding:
+        return _stdlib_dumps(obj, use_binary_hex_encoding=True)
+    return orjson.dumps(obj, default=_default)
+
+
+def install():
+    """Route autobahn's JSON serializer through orjson. Returns False if orjson is missing."""
+    if orjson is None:
+        return False
+    serializer._loads = _loads
+    serializer._dumps = _dumps
+    return True
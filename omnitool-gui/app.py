@@ -3,31 +3,61 @@ import os
 import sys
 import threading
 import logging
-import webview as pywebview
+import logging.handlers
+import atexit
 import argparse
-from flask import Flask, jsonify, request
+import queue
+from flask import Flask, Response, jsonify, request
 import importlib.util
 import traceback
 import json
 import time
-import ctypes
-from pathlib import Path
-import shutil
-from waitress import serve 
 import urllib.parse
-import requests
+import functools
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import windll, wintypes, c_int, byref, sizeof
+
+    # Declare the DWM signature once so ctypes doesn't infer argument types
+    # (and truncate 64-bit window handles to int) on every call
+    _DwmSetWindowAttribute = windll.dwmapi.DwmSetWindowAttribute
+    _DwmSetWindowAttribute.argtypes = [wintypes.HWND, wintypes.DWORD, ctypes.c_void_p, wintypes.DWORD]
+    # Plain LONG rather than HRESULT: the caption/border colors are rejected
+    # on Windows 10 and must not raise before the remaining calls run
+    _DwmSetWindowAttribute.restype = wintypes.LONG
+
+    # Attribute values are constant, so the buffers are shared across calls.
+    # RGB color format - 0x00BBGGRR (reversed order)
+    _DWM_DARK_MODE = c_int(1)
+    _DWM_CAPTION_COLOR = c_int(0x00303030)  # Dark gray
+    _DWM_BORDER_COLOR = c_int(0x00303030)  # Dark gray
+
+    # Console window helpers, bound once with their prototypes
+    _ShowWindow = ctypes.WinDLL("user32", use_last_error=True).ShowWindow
+    _ShowWindow.argtypes = [wintypes.HWND, ctypes.c_int]
+    _ShowWindow.restype = wintypes.BOOL
+    _GetConsoleWindow = ctypes.WinDLL("kernel32", use_last_error=True).GetConsoleWindow
+    _GetConsoleWindow.argtypes = []
+    _GetConsoleWindow.restype = wintypes.HWND
 
 try:
-    indicator_module = importlib.import_module('indicator_window')
-    INDICATOR_AVAILABLE = True
-    print("LLM control indicator module loaded successfully")
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    INDICATOR_AVAILABLE = False
-    print("LLM control indicator module not available")
+    ORJSON_AVAILABLE = False
+
+# main.py, loaded below, imports the indicator (and requests, PIL) at the
+# top level anyway, so there is nothing to gain from deferring it here.
+# webview and pystray, which main.py doesn't need, are imported on first use.
+import indicator_window as indicator_module
 
 # Global variable to track system tray status
 _tray_icon = None
 _window = None  # Global window reference
+# Set when the window is hidden to the tray so the monitor re-checks it at once
+_tray_check_event = threading.Event()
+TRAY_CHECK_INTERVAL = 60  # Fallback re-check, in seconds
 
 # Default configuration for stop API URL 
 DEFAULT_STOP_API_URL = "http://gcp_training2.hertzai.com:5001/stop"
@@ -59,23 +89,35 @@ except Exception as e:
     args = DefaultArgs()
 
 # Configure logging
+# These locations never change while the process runs, so resolve them once
 user_docs = os.path.join(os.path.expanduser('~'), 'Documents')
-log_dir = os.path.join(user_docs, 'HevolveAi Agent Companion', 'logs')
+APP_DATA_DIR = os.path.join(user_docs, 'HevolveAi Agent Companion')
+log_dir = os.path.join(APP_DATA_DIR, 'logs')
+STORAGE_DIR = os.path.join(APP_DATA_DIR, 'storage')
+USER_DATA_FILE = os.path.join(STORAGE_DIR, 'user_data.json')
+DEVICE_ID_FILE = os.path.join(APP_DATA_DIR, 'device_id.json')
 os.makedirs(log_dir, exist_ok=True)
+os.makedirs(STORAGE_DIR, exist_ok=True)
 log_file = os.path.join(log_dir, 'gui_app.log')
 
-logging.basicConfig(
-    filename=log_file,
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    filemode='a'
-)
+# Rotate the log file. Records are handed to a background listener thread
+# through a queue, so logging from the GUI and request threads never waits
+# on the disk; the listener drains what is left at exit.
+file_handler = logging.handlers.RotatingFileHandler(log_file, mode='a', maxBytes=2_000_000, backupCount=5)
+file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_handlers = [file_handler]
 
 # Add console handler if not running in background
 if not args.background:
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
-    logging.getLogger().addHandler(console_handler)
+    log_handlers.append(console_handler)
+
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(log_queue)])
+log_listener.start()
+atexit.register(log_listener.stop)
 
 logger = logging.getLogger('HevolveAiAgentCompanionGUI')
 
@@ -85,6 +127,40 @@ logger.info(f"Original arguments: {sys.argv}")
 logger.info(f"Parsed arguments: port={args.port}, width={args.width}, height={args.height}, " +
            f"title={args.title}, background={args.background}, stop_api_url = {args.stop_api_url}")
 
+_stop_session = None
+_stop_session_lock = threading.Lock()
+
+def _get_stop_session():
+    """Return the shared keep-alive session for the stop API, creating it on first use"""
+    global _stop_session
+    with _stop_session_lock:
+        if _stop_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4,
+                                  max_retries=Retry(total=2, backoff_factor=0.2))
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"Content-Type": "application/json"})
+            _stop_session = session
+        return _stop_session
+
+def _json_dumps(obj):
+    """Serialize obj to UTF-8 JSON bytes, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+def _ojsonify(obj, status=200):
+    """jsonify() replacement for the frequently polled routes"""
+    return Response(_json_dumps(obj), status=status, mimetype='application/json')
+
+# Serializes writers: one temp file, and the cache must match what's on disk
+_user_data_write_lock = threading.Lock()
+
 # Function to call the Stop API endpoint
 def call_stop_api():
     """
@@ -94,35 +170,31 @@ def call_stop_api():
         logger.info(f"Calling stop API ay {args.stop_api_url}")
 
         # Try to get user data from storage
-        user_data_file = os.path.join(user_docs, 'HevolveAi Agent Companion', 'storage', 'user_data.json')
         stop_payload = {}
 
-        if os.path.exists(user_data_file):
-            try:
-                with open(user_data_file, 'r') as f:
-                    user_data = json.load(f)
-                    user_id = user_data.get('user_id')
-
-                    if user_id:
-                        stop_payload['user_id'] = user_id
-
-                        # If we've prompt_id, include it too
-                        prompt_id = user_data.get('prompt_id')
-                        if prompt_id:
-                            stop_payload['prompt_id'] = prompt_id
-                            logger.info(f"Using specific stop for user_id={user_id}, prompt_id={prompt_id}")
-                        else:
-                            logger.info(f"Using user-specific stop for user_id={user_id}")
-            except Exception as e:
-                logger.error(f"Error reading user data: {str(e)}")
-        else:
+        try:
+            user_data = _load_user_data()
+            user_id = user_data.get('user_id')
+
+            if user_id:
+                stop_payload['user_id'] = user_id
+
+                # If we've prompt_id, include it too
+                prompt_id = user_data.get('prompt_id')
+                if prompt_id:
+                    stop_payload['prompt_id'] = prompt_id
+                    logger.info(f"Using specific stop for user_id={user_id}, prompt_id={prompt_id}")
+                else:
+                    logger.info(f"Using user-specific stop for user_id={user_id}")
+        except FileNotFoundError:
             logger.info("No user data file found, using global stop")
+        except Exception as e:
+            logger.error(f"Error reading user data: {str(e)}")
         
         # Call the API
-        response = requests.post(
+        response = _get_stop_session().post(
             args.stop_api_url,
             json=stop_payload,
-            headers={"Content-Type":  "application/json"},
             timeout=10
         )
 
@@ -168,7 +240,9 @@ def ensure_working_directory():
 # Flask server to communicate with the GUI
 gui_app = Flask(__name__)
 
-# Import the main.py flask app dynamically
+# Import the main.py flask app dynamically. Switch to the application directory
+# first so main.py's relative paths resolve the same way as a direct launch.
+ensure_working_directory()
 try:
     # Get the path to main.py in the same directory as this script
     if getattr(sys, 'frozen', False):
@@ -180,17 +254,19 @@ try:
     
     main_path = os.path.join(app_dir, 'main.py')
     
-    # Load main.py as a module
+    # Load main.py as a module (SourceFileLoader reuses main.py's cached .pyc)
+    load_start = time.perf_counter()
     spec = importlib.util.spec_from_file_location("main_module", main_path)
     main_module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(main_module)
+    logger.info(f"Loaded main.py in {time.perf_counter() - load_start:.3f}s")
     
     # Get the Flask app instance from main.py
     flask_app = main_module.app
     
-    # Add CORS headers to all routes
-    from flask_cors import CORS
-    CORS(flask_app)
+    # user_data.json is cached once per process, by main.py
+    _load_user_data = main_module.load_user_data
+    _cache_user_data = main_module.cache_user_data
     
     logger.info("Successfully imported main.py Flask application")
 except Exception as e:
@@ -198,75 +274,242 @@ except Exception as e:
     logger.error(traceback.format_exc())
     sys.exit(1)
 
+# GUI routes are registered once, at import, on the app loaded from main.py
+# Add CORS headers to all routes. Flask already answers OPTIONS preflight
+# requests for every registered route, so the headers are all that's needed.
+_CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+}
+
+@flask_app.after_request
+def add_cors_headers(response):
+    response.headers.update(_CORS_HEADERS)
+    return response
+
+# Add hide to tray endpoint
+@flask_app.route('/hide_to_tray', methods=['GET'])
+def hide_to_tray_endpoint():
+    # This will signal the window to be hidden in the main thread
+    if _window:
+        _window.hide()
+        # Show notification
+        if _tray_icon:
+            notify_minimized_to_tray(_tray_icon)
+    return jsonify({"success": True})
+
+# Add show window endpoint
+@flask_app.route('/show_window', methods=['GET'])
+def show_window_endpoint():
+    if _window:
+        _window.show()
+    return jsonify({"success": True})
+
+@flask_app.route('/indicator/<action>', methods=['GET'])
+def indicator_endpoint(action):
+    """Show, hide or get the status of the LLM control indicator"""
+    handler = _INDICATOR_ACTIONS.get(action)
+    if handler is None:
+        return _ojsonify({"success": False, "error": f"Unknown indicator action: {action}"}, 404)
+    try:
+        return _ojsonify({"success": True, "status": handler(indicator_module)})
+    except Exception as e:
+        return _ojsonify({"success": False, "error": str(e)})
+
+@flask_app.route('/api/storage/set', methods = ['POST'])
+def set_storage():
+    try:
+        # Malformed bodies or a wrong content type come back as None
+        # instead of raising, so they take the same path as an empty payload
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            data = {}
+
+        # Validate that we've at least one of the expected keys
+        found_keys = [key for key in _EXPECTED_KEYS if key in data]
+
+        if not found_keys:
+            return Response(_EMPTY_KEYS_RESPONSE, mimetype='application/json')
+
+        # Store in a file
+        user_data = {}
+        # Update specific keys from the data
+        for key in found_keys:
+            user_data[key] = data[key]
+
+        # Save the new data (completely overwriting any existing file).
+        # Serialize once, write it in a single call to a temp file and
+        # swap it in so a crash mid-write never leaves a truncated file.
+        payload = _json_dumps(user_data)
+        tmp_file = USER_DATA_FILE + '.tmp'
+        with _user_data_write_lock:
+            with open(tmp_file, 'wb', buffering=0) as f:
+                f.write(payload)
+            # The rename keeps this mtime, so it identifies exactly what we wrote
+            mtime_ns = os.stat(tmp_file).st_mtime_ns
+            os.replace(tmp_file, USER_DATA_FILE)
+            # Write through to the cache so the next read skips the disk
+            _cache_user_data(user_data, mtime_ns)
+
+        logger.info(f"Completely overwrote user_data.json with new data containing keys: {list(user_data.keys())}")
+
+        # Check if we have all required keys to update the URL
+        all_required_keys_present = _REQUIRED_KEYS <= user_data.keys()
+        url_updated = False
+
+        if all_required_keys_present and _window:
+            # Construct the new URL with all parameters
+            new_url = _build_agent_url(user_data)
+
+            logger.info(f"Attempting to load URL: {new_url}")
+
+            # Update the window URL
+            try:
+                _window.load_url(new_url)
+                logger.info(f"Updated window URL to: {new_url}")
+                url_updated = True
+            except Exception as e:
+                logger.error(f"Failed to update window URL: {str(e)}")
+
+        return jsonify({
+            'success': True, 
+            'url_updated': url_updated,
+            'keys_present': list(user_data.keys()),
+            'all_required_keys_present': all_required_keys_present})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@flask_app.route('/api/storage/get/<key>', methods=['GET'])
+def get_storage(key):
+    try:
+        try:
+            user_data = _load_user_data()
+        except FileNotFoundError:
+            return _ojsonify({"success": False, "error": "User data not found"})
+
+        if key in user_data:
+            return _ojsonify({"success": True, "data": user_data[key]})
+        else:
+            return _ojsonify({"success": False, "error": "Key not found"})
+    except Exception as e:
+        return _ojsonify({"success": False, "error": str(e)})
+
+@flask_app.route('/api/storage/get_batch', methods=['POST'])
+def get_storage_batch():
+    """Return several stored keys in one round trip instead of one GET per key"""
+    try:
+        body = request.get_json(silent=True)
+        keys = body.get('keys') if isinstance(body, dict) else None
+        if not isinstance(keys, list) or not all(isinstance(k, str) for k in keys):
+            return _ojsonify({"success": False, "error": "'keys' must be a list of strings"}, 400)
+        try:
+            user_data = _load_user_data()
+        except FileNotFoundError:
+            return _ojsonify({"success": False, "error": "User data not found"})
+
+        return _ojsonify({
+            "success": True,
+            "data": {k: user_data[k] for k in keys if k in user_data},
+            "missing": [k for k in keys if k not in user_data]})
+    except Exception as e:
+        return _ojsonify({"success": False, "error": str(e)})
+
+# Keys /api/storage/set accepts (a tuple, so they are written in a stable
+# order), and the ones needed to build the agent URL
+_EXPECTED_KEYS = ('agentname', 'email', 'access_token', 'user_id')
+_REQUIRED_KEYS = frozenset(('agentname', 'user_id', 'access_token', 'email'))
+_EMPTY_KEYS_RESPONSE = _json_dumps({
+    'success': False,
+    'companion_app': True,
+    'error': 'No valid keys provided. Expceted one of: agentname, email, token or user_id'
+})
+
+AGENT_URL_TMPL = ("https://hevolve.hertzai.com/agents/{name}?"
+                  "email={email}&token={tok}&userid={uid}&companion=true")
+
+@functools.lru_cache(maxsize=256)
+def _q(value):
+    """URL encode a single parameter; the same user's values repeat across calls"""
+    return urllib.parse.quote(value)
+
+def _build_agent_url(user_data):
+    """Build the agent page URL from stored user data, encoding each parameter"""
+    return AGENT_URL_TMPL.format_map({
+        'name': _q(user_data['agentname']),
+        'email': _q(user_data['email']),
+        'tok': _q(user_data['access_token']),
+        'uid': _q(str(user_data['user_id'])),
+    })
+
 def check_existing_user_data():
     """Check for existing user data and update URL if all required data is present"""
     try:
-        storage_dir = os.path.join(os.path.expanduser('~'), 'Documents', 'HevolveAi Agent Companion', 'storage')
-        user_data_file = os.path.join(storage_dir, 'user_data.json')
-
-        if os.path.exists(user_data_file):
-            logger.info("Found existing user_data.json, checking contents")
+        try:
+            user_data = _load_user_data()
+            
+            logger.info(f"Loaded the JSON file from storage the value contains {user_data.keys()}")
 
-            try:
-                with open(user_data_file, 'r') as f:
-                    user_data = json.load(f)
+            # Check if all required keys are present
+            if _REQUIRED_KEYS <= user_data.keys():
+                # Construct the URL with all parameters
+                new_url = _build_agent_url(user_data)
                 
-                logger.info(f"Loaded the JSON file from storage the value contains {user_data.keys()}")
-
-                # Check if all required keys are present
-                required_keys = ['agentname', 'user_id', 'access_token', 'email']
-                if all(k in user_data for k in required_keys):
-                    # Construct the URL with all parameters
-
-                    # Properly URL encode each parameter
-                    agent_name_encoded = urllib.parse.quote(user_data['agentname'])
-                    email_encoded = urllib.parse.quote(user_data['email'])
-                    token_encoded = urllib.parse.quote(user_data['access_token'])
-                    userid_encoded = urllib.parse.quote(str(user_data['user_id']))
-
-                    new_url = (f"https://hevolve.hertzai.com/agents/{agent_name_encoded}?"
-                               f"email={email_encoded}&"
-                               f"token={token_encoded}&"
-                               f"userid={userid_encoded}&"
-                               f"companion=true")
-                    
-                    logger.info(f"Loading saved user data URL: {new_url}")
-                    return new_url
-                else:
-                    logger.info("User data file exists but doesn't contain all required keys, using default URL")
-            except json.JSONDecodeError:
-                logger.error("User data file exists but contains invalid JSON, using default URL")
-        else:
+                logger.info(f"Loading saved user data URL: {new_url}")
+                return new_url
+            else:
+                logger.info("User data file exists but doesn't contain all required keys, using default URL")
+        except FileNotFoundError:
             logger.info("No existing user_data.json file found, using default URL")
+        except json.JSONDecodeError:
+            logger.error("User data file exists but contains invalid JSON, using default URL")
         
         return "https://hevolve.hertzai.com/agents/Instructable-Agent?companion=true"
     except Exception as e:
         logger.error(f"Error checking existing user data: {str(e)}")
         return "https://hevolve.hertzai.com/agents/Instructable-Agent?companion=true"
 
-def initialize_indicator(server_port=5000):
-    """Initialize the indicator window if available"""
-    if not INDICATOR_AVAILABLE:
-        return False
-    
+def _show_indicator(indicator):
+    indicator.toggle_indicator(True)
+    return "showing"
+
+def _hide_indicator(indicator):
+    indicator.toggle_indicator(False)
+    return "hidden"
+
+# /indicator/<action> handlers; each returns the status reported to the caller
+_INDICATOR_ACTIONS = {
+    'show': _show_indicator,
+    'hide': _hide_indicator,
+    'status': lambda indicator: indicator.get_status(),
+}
+
+def initialize_indicator(window_instance, server_port=5000):
+    """Initialize the indicator window once the main window has been shown"""
     try:
-        # Start indicator in a separate thread to avoid blocking
-        def init_indicator_thread():
+        def start_indicator():
             try:
-                # Add a delay to ensure main window is created first
-                time.sleep(2)
-                
                 # Initialize and then hide the indicator window
                 indicator_module.initialize_indicator(server_port)  # Pass the port
                 # Make sure it's explicitly hidden
                 indicator_module.toggle_indicator(False, server_port)  # Pass port here too
                 print("LLM control indicator initialized and hidden")
             except Exception as e:
-                print(f"Error in indicator initialization thread: {str(e)}")
+                print(f"Error in indicator initialization: {str(e)}")
         
-        # Start the thread
-        indicator_thread = threading.Thread(target=init_indicator_thread, daemon=True)
-        indicator_thread.start()
+        # shown handlers run one after another on a single thread, so hand the
+        # (possibly slow) indicator start-up to its own thread and return.
+        # Unsubscribing while pywebview is dispatching would skip the next
+        # handler, so a flag keeps this one-shot instead.
+        started = False
+        def on_shown():
+            nonlocal started
+            if started:
+                return
+            started = True
+            threading.Thread(target=start_indicator, daemon=True, name='indicator-init').start()
+        
+        window_instance.events.shown += on_shown
         return True
     
     except Exception as e:
@@ -276,153 +519,13 @@ def initialize_indicator(server_port=5000):
 def start_flask():
     """Start the Flask server in a separate thread"""
     try:
-        # Add hide to tray endpoint
-        @flask_app.route('/hide_to_tray', methods=['GET'])
-        def hide_to_tray_endpoint():
-            # This will signal the window to be hidden in the main thread
-            global _window
-            if _window:
-                _window.hide()
-                # Show notification
-                if _tray_icon:
-                    notify_minimized_to_tray(_tray_icon)
-            return jsonify({"success": True})
-        
-        # Add show window endpoint
-        @flask_app.route('/show_window', methods=['GET'])
-        def show_window_endpoint():
-            global _window
-            if _window:
-                _window.show()
-            return jsonify({"success": True})
-        
-        @flask_app.route('/indicator/show', methods=['GET'])
-        def show_indicator_endpoint():
-            """Show the LLM control indicator"""
-            if INDICATOR_AVAILABLE:
-                try:
-                    indicator_module.toggle_indicator(True)
-                    return jsonify({"success": True, "status": "showing"})
-                except Exception as e:
-                    return jsonify({"success": False, "error": str(e)})
-            else:
-                return jsonify({"success": False, "error": "Indicator module not available"})
-
-        @flask_app.route('/indicator/hide', methods=['GET'])
-        def hide_indicator_endpoint():
-            """Hide the LLM control indicator"""
-            if INDICATOR_AVAILABLE:
-                try:
-                    indicator_module.toggle_indicator(False)
-                    return jsonify({"success": True, "status": "hidden"})
-                except Exception as e:
-                    return jsonify({"success": False, "error": str(e)})
-            else:
-                return jsonify({"success": False, "error": "Indicator module not available"})
-
-        @flask_app.route('/indicator/status', methods=['GET'])
-        def indicator_status_endpoint():
-            """Get the status of the LLM control indicator"""
-            if INDICATOR_AVAILABLE:
-                try:
-                    status = indicator_module.get_status()
-                    return jsonify({"success": True, "status": status})
-                except Exception as e:
-                    return jsonify({"success": False, "error": str(e)})
-            else:
-                return jsonify({"success": False, "error": "Indicator module not available"})
-                
-        @flask_app.route('/api/storage/set', methods = ['POST'])
-        def set_storage():
-            try:
-                global _window
-                data = request.json
-                
-                # Validate that we've at least one of the expected keys
-                expected_keys = ['agentname', 'email', 'access_token', 'user_id']
-                found_keys = [key for key in expected_keys if key in data]
-
-                if not found_keys:
-                    return jsonify({
-                        'success': False,
-                        'companion_app': True,
-                        'error': 'No valid keys provided. Expceted one of: agentname, email, token or user_id'
-                    })
-                
-                # Store in a file
-                storage_dir = os.path.join(os.path.expanduser('~'), 'Documents', 'HevolveAi Agent Companion', 'storage')
-                os.makedirs(storage_dir, exist_ok=True)
-                user_data_file = os.path.join(storage_dir, 'user_data.json')
-
-                user_data = {}
-                # Update specific keys from the data
-                for key in found_keys:
-                    user_data[key] = data[key]
-
-                # Save the new data (completely overwriting any existing file)
-                with open(user_data_file, 'w') as f:
-                    json.dump(user_data, f)
-                
-                logger.info(f"Completely overwrote user_data.json with new data containing keys: {list(user_data.keys())}")
-                
-                # Check if we have all required keys to update the URL
-                required_keys = ['agentname', 'user_id', 'access_token', 'email']
-                url_updated = False
-
-                if all(k in user_data for k in required_keys) and _window:
-                    #Properly URL encode each parameter
-                    agent_name_encoded = urllib.parse.quote(user_data['agentname'])
-                    email_encoded = urllib.parse.quote(user_data['email'])
-                    token_encoded = urllib.parse.quote(user_data['access_token'])
-                    userid_encoded = urllib.parse.quote(str(user_data['user_id']))
-                    # Construct the new URL with all parameters
-                    new_url = (f"https://hevolve.hertzai.com/agents/{agent_name_encoded}?"
-                               f"email={email_encoded}&"
-                               f"token={token_encoded}&"
-                               f"userid={userid_encoded}&"
-                               f"companion=true")
-                    
-                    logger.info(f"Attempting to load URL: {new_url}")
-                    
-                    # Update the window URL
-                    try:
-                        _window.load_url(new_url)
-                        logger.info(f"Updated window URL to: {new_url}")
-                        url_updated = True
-                    except Exception as e:
-                        logger.error(f"Failed to update window URL: {str(e)}")
-                
-                return jsonify({
-                    'success': True, 
-                    'url_updated': url_updated,
-                    'keys_present': list(user_data.keys()),
-                    'all_required_keys_present': all(k in user_data for k in required_keys)})
-            except Exception as e:
-                return jsonify({'success': False, 'error': str(e)})
-
-        @flask_app.route('/api/storage/get/<key>', methods=['GET'])
-        def get_storage(key):
-            try:
-                user_data_file = os.path.join(os.path.expanduser('~'), 'Documents', 'HevolveAi Agent Companion', 'storage', f'user_data.json')
-
-                if os.path.exists(user_data_file):
-                    with open(user_data_file, 'r') as f:
-                        user_data = json.load(f)
-                    
-                    if key in user_data:
-                        return jsonify({"success": True, "data": user_data[key]})
-                    else:
-                        return jsonify({"success": False, "error": "Key not found"})
-                else:
-                    return jsonify({"success": False, "error": "User data not found"})
-            except Exception as e:
-                return jsonify({"success": False, "error": str(e)})
-                          
-        
-        # Start the main Flask application on the specified port
+        # Start the main Flask application on the specified port.
+        # waitress handles requests on a thread pool with keep-alive, unlike
+        # the single-threaded Werkzeug dev server.
+        from waitress import serve
         logger.info(f"Starting Flask server on port {args.port}")
-        flask_app.run(debug=False, host="0.0.0.0", port=args.port, use_reloader=False)
-        # serve(flask_app, host="0.0.0.0", port=args.port)
+        serve(flask_app, host="0.0.0.0", port=args.port, threads=8,
+              connection_limit=256, channel_timeout=60)
     except Exception as e:
         logger.error(f"Error starting Flask server: {str(e)}")
         logger.error(traceback.format_exc())
@@ -432,13 +535,11 @@ def get_server_info():
     """Get server information to display in the UI"""
     try:
         # Try to fetch the device ID from the same location main.py would use
-        user_docs = os.path.join(os.path.expanduser('~'), 'Documents')
-        device_id_dir = os.path.join(user_docs, 'HevolveAi Agent Companion')
-        device_id_file = os.path.join(device_id_dir, 'device_id.json')
-        if os.path.exists(device_id_file):
-            with open(device_id_file, 'r') as f:
-                data = json.load(f)
-                return {"device_id": data.get('device_id')}
+        with open(DEVICE_ID_FILE, 'rb') as f:
+            data = json.loads(f.read())
+            return {"device_id": data.get('device_id')}
+    except FileNotFoundError:
+        pass
     except Exception as e:
         logger.warning(f"Failed to get device ID: {str(e)}")
     
@@ -458,9 +559,6 @@ def set_window_theme_attribute(window_instance):
         return False
         
     try:
-        import ctypes
-        from ctypes import windll, c_int, byref, sizeof
-        
         # Windows 11 specific constants
         DWMWA_USE_IMMERSIVE_DARK_MODE = 20
         DWMWA_CAPTION_COLOR = 35
@@ -482,31 +580,27 @@ def set_window_theme_attribute(window_instance):
                     return False
                 
                 # Try setting dark mode (Windows 10 and 11)
-                dark_mode = c_int(1)
-                windll.dwmapi.DwmSetWindowAttribute(
+                _DwmSetWindowAttribute(
                     hwnd, 
                     DWMWA_USE_IMMERSIVE_DARK_MODE,
-                    byref(dark_mode), 
-                    sizeof(dark_mode)
+                    byref(_DWM_DARK_MODE), 
+                    sizeof(_DWM_DARK_MODE)
                 )
                 
                 # Try setting title bar color (Windows 11)
-                # RGB color format - 0x00BBGGRR (reversed order)
-                title_color = c_int(0x00303030)  # Dark gray
-                windll.dwmapi.DwmSetWindowAttribute(
+                _DwmSetWindowAttribute(
                     hwnd,
                     DWMWA_CAPTION_COLOR,
-                    byref(title_color),
-                    sizeof(title_color)
+                    byref(_DWM_CAPTION_COLOR),
+                    sizeof(_DWM_CAPTION_COLOR)
                 )
                 
                 # Set border color
-                border_color = c_int(0x00303030)  # Dark gray
-                windll.dwmapi.DwmSetWindowAttribute(
+                _DwmSetWindowAttribute(
                     hwnd,
                     DWMWA_BORDER_COLOR,
-                    byref(border_color),
-                    sizeof(border_color)
+                    byref(_DWM_BORDER_COLOR),
+                    sizeof(_DWM_BORDER_COLOR)
                 )
                 
                 logger.info("Successfully set window theme attributes")
@@ -521,67 +615,108 @@ def set_window_theme_attribute(window_instance):
         logger.error(f"Error setting up window theme: {str(e)}")
         return False
 
-def apply_dark_mode_to_all_windows():
-    """Apply dark mode to all windows using a timer-based approach"""
-    if sys.platform != "win32":
-        return
-        
-    import ctypes
-    import time
-    import threading
-    
-    # Windows 10/11 dark mode constants
-    DWMWA_USE_IMMERSIVE_DARK_MODE = 20
-    
-    def find_and_set_dark_mode():
+def _get_app_dir():
+    if getattr(sys, 'frozen', False):
+        # If running as a bundle (compiled with cx_freeze)
+        return os.path.dirname(sys.executable)
+    # If running as a script
+    return os.path.dirname(os.path.abspath(__file__))
+
+_tray_icon_image = None  # Set after the first successful load
+
+def _load_tray_icon():
+    """Decode the tray icon image once, even if the tray setup is retried.
+
+    Failures aren't remembered, so a later retry tries loading again.
+    """
+    global _tray_icon_image
+    if _tray_icon_image is not None:
+        return _tray_icon_image
+
+    import pystray
+    from PIL import Image
+
+    icon_path = os.path.join(_get_app_dir(), 'app.ico')
+    logger.info(f"Looking for icon at: {icon_path}")
+
+    if os.path.exists(icon_path):
         try:
-            # Function to enumerate all windows
-            EnumWindows = ctypes.windll.user32.EnumWindows
-            EnumWindowsProc = ctypes.WINFUNCTYPE(ctypes.c_bool, ctypes.c_int, ctypes.POINTER(ctypes.c_int))
-            GetWindowText = ctypes.windll.user32.GetWindowTextW
-            GetWindowTextLength = ctypes.windll.user32.GetWindowTextLengthW
-            
-            titles = []
-            
-            def foreach_window(hwnd, lParam):
-                length = GetWindowTextLength(hwnd)
-                if length > 0:
-                    buff = ctypes.create_unicode_buffer(length + 1)
-                    GetWindowText(hwnd, buff, length + 1)
-                    title = buff.value
-                    titles.append((hwnd, title))
-                return True
-            
-            # Enumerate all windows
-            EnumWindows(EnumWindowsProc(foreach_window), 0)
-            
-            # Find our window by title
-            for hwnd, title in titles:
-                if args.title in title:
-                    # Set dark mode
-                    value = ctypes.c_int(1)  # 1 = dark mode
-                    try:
-                        ctypes.windll.dwmapi.DwmSetWindowAttribute(
-                            hwnd, 
-                            DWMWA_USE_IMMERSIVE_DARK_MODE,
-                            ctypes.byref(value), 
-                            ctypes.sizeof(value)
-                        )
-                        logger.info(f"Applied dark mode to window: {title}")
-                    except Exception as e:
-                        logger.error(f"Failed to apply dark mode to {title}: {str(e)}")
-        
+            icon_image = Image.open(icon_path)
+            logger.info(f"Using icon from {icon_path}")
+            _tray_icon_image = icon_image
+            return icon_image
         except Exception as e:
-            logger.error(f"Error in dark mode thread: {str(e)}")
-    
-    # Set dark mode with a slight delay to ensure window is created
-    timer_thread = threading.Timer(1.0, find_and_set_dark_mode)
-    timer_thread.daemon = True
-    timer_thread.start()
+            logger.error(f"Error loading icon {icon_path}: {str(e)}")
+    else:
+        logger.error(f"Icon file not found at {icon_path}")
+
+    # Try to create a default icon if app.ico is not available
+    try:
+        icon_image = pystray.Icon('HevolveAiAgentCompanion').icon
+        logger.info("Using default pystray icon")
+        _tray_icon_image = icon_image
+        return icon_image
+    except Exception as e:
+        logger.error(f"Failed to create default icon: {str(e)}")
+        return None
+
+def on_quit_clicked(icon, item):
+    logger.info("Quit selected from system tray menu")
+    icon.stop()
+    # os._exit skips atexit, so write out queued log records first
+    log_listener.stop()
+    try:
+        os._exit(0)
+    except Exception:
+        sys.exit(0)
+
+def on_restore_clicked(icon, item):
+    logger.info("Restore selected from system tray menu")
+    # Show the window with dimension 320x300
+    try:
+        # First show the window to ensure it's visible
+        _window.show()
+        # Then resize it - order matters in pywebview
+        _window.resize(320, 300)
+        # Force window to be on top
+        if hasattr(_window, 'move_to_center'):
+            _window.move_to_center()
+        logger.info("Window restored to 320x300")
+    except Exception as e:
+        logger.error(f"Error restoring window: {str(e)}")
+        # Fallback approach
+        try:
+            _window.show()
+            logger.info("Window shown with fallback method")
+        except Exception as e2:
+            logger.error(f"Fallback show also failed: {str(e2)}")
+
+def on_maximize_clicked(icon, item):
+    logger.info("Maximize selected from system tray menu")
+    try:
+        _window.show()
+        _window.maximize()
+    except Exception as e:
+        logger.error(f"Error maximizing window: {str(e)}")
 
+def on_tray_clicked(icon):
+    # When tray icon is clicked, show the menu rather than restoring the window
+    logger.info("Tray icon clicked, showing menu")
+    # We don't need to take action here as the menu will appear automatically
+    pass
+
+@functools.lru_cache(maxsize=None)
+def _tray_menu():
+    """Build the system tray menu once; the handlers act on the global _window"""
+    import pystray
+    return pystray.Menu(
+        pystray.MenuItem('Restore', on_restore_clicked),
+        pystray.MenuItem('Maximize', on_maximize_clicked),
+        pystray.MenuItem('Quit', on_quit_clicked)
+    )
 
 # Improved system tray setup with singleton pattern
-def setup_system_tray(window_instance):
+def setup_system_tray():
     global _tray_icon
     
     # Return existing icon if already set up
@@ -592,99 +727,17 @@ def setup_system_tray(window_instance):
     try:
         logger.info("Setting up new system tray icon")
         import pystray
-        from PIL import Image
-        import json
-
-        if getattr(sys, 'frozen', False):
-            # If running as a bundle (compiled with cx_freeze)
-            app_dir = os.path.dirname(sys.executable)
-        else:
-            # If running as a script
-            app_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        icon_path = os.path.join(app_dir, 'app.ico')
-        logger.info(f"Looking for icon at: {icon_path}")
-
-        if os.path.exists(icon_path):
-            try:
-                icon_image = Image.open(icon_path)
-                logger.info(f"Using icon from {icon_path}")
-            except Exception as e:
-                logger.error(f"Error loading icon {icon_path}: {str(e)}")
-                # Try to create a default icon if app.ico is not available
-                try:
-                    icon_image = pystray.Icon('HevolveAiAgentCompanion').icon
-                    logger.info("Using default pystray icon")
-                except Exception as e2:
-                    logger.error(f"Failed to create default icon: {str(e2)}")
-                    return None
-        else:
-            logger.error(f"Icon file not found at {icon_path}")
-            try:
-                # Try to create a default icon
-                icon_image = pystray.Icon('HevolveAiAgentCompanion').icon
-                logger.info("Using default pystray icon")
-            except Exception as e:
-                logger.error(f"Failed to create default icon: {str(e)}")
-                return None
-        
-        def on_quit_clicked(icon, item):
-            logger.info("Quit selected from system tray menu")
-            icon.stop()
-            try:
-                os._exit(0)
-            except Exception:
-                sys.exit(0)
-        
-        def on_restore_clicked(icon, item):
-            logger.info("Restore selected from system tray menu")
-            # Show the window with dimension 320x300
-            try:
-                # First show the window to ensure it's visible
-                window_instance.show()
-                # Then resize it - order matters in pywebview
-                window_instance.resize(320, 300)
-                # Force window to be on top
-                if hasattr(window_instance, 'move_to_center'):
-                    window_instance.move_to_center()
-                logger.info("Window restored to 320x300")
-            except Exception as e:
-                logger.error(f"Error restoring window: {str(e)}")
-                # Fallback approach
-                try:
-                    window_instance.show()
-                    logger.info("Window shown with fallback method")
-                except Exception as e2:
-                    logger.error(f"Fallback show also failed: {str(e2)}")
-        
-        def on_maximize_clicked(icon, item):
-            logger.info("Maximize selected from system tray menu")
-            try:
-                window_instance.show()
-                window_instance.maximize()
-            except Exception as e:
-                logger.error(f"Error maximizing window: {str(e)}")
-                
-        def on_tray_clicked(icon):
-            # When tray icon is clicked, show the menu rather than restoring the window
-            logger.info("Tray icon clicked, showing menu")
-            # We don't need to take action here as the menu will appear automatically
-            pass
 
-        
-        # Define system tray menu
-        menu = pystray.Menu(
-            pystray.MenuItem('Restore', on_restore_clicked),
-            pystray.MenuItem('Maximize', on_maximize_clicked),
-            pystray.MenuItem('Quit', on_quit_clicked)
-        )
+        icon_image = _load_tray_icon()
+        if icon_image is None:
+            return None
         
         # Create a system tray icon with the proper icon
         _tray_icon = pystray.Icon(
             'HevolveAiAgentCompanion',  # Use a unique name
             icon_image,
             'HevolveAi Agent Companion',
-            menu
+            _tray_menu()
         )
         
         # Register the on_click handler
@@ -693,6 +746,7 @@ def setup_system_tray(window_instance):
         # Start the icon in a separate thread
         icon_thread = threading.Thread(target=_tray_icon.run, daemon=True)
         icon_thread.start()
+        start_notification_thread()
         
         logger.info("System tray icon started successfully")
         return _tray_icon
@@ -705,18 +759,33 @@ def setup_system_tray(window_instance):
         logger.error(traceback.format_exc())
         return None
 
+# Tray notifications are shown from a dedicated thread so callers such as
+# the /hide_to_tray route never block on the Windows shell
+_notify_queue = queue.Queue()
+_notify_thread = None
+
+def _notification_worker():
+    while True:
+        icon, message = _notify_queue.get()
+        try:
+            # Use the pystray's native notification instead of win10toast
+            icon.notify(message, "HevolveAi Agent Companion")
+            logger.info("Notification shown successfully")
+        except Exception:
+            logger.exception("Error showing notification")
+
+def start_notification_thread():
+    global _notify_thread
+    if _notify_thread is None:
+        _notify_thread = threading.Thread(target=_notification_worker, daemon=True)
+        _notify_thread.start()
+
 # Improved notification function that doesn't use win10toast
 def notify_minimized_to_tray(icon, message="Application minimized to system tray"):
-    """Show a notification that the app is minimized to the system tray"""
+    """Queue a notification that the app is minimized to the system tray"""
     logger.info(f"Showing notification: {message}")
-    
-    try:
-        # Use the pystray's native notification instead of win10toast
-        icon.notify(message, "HevolveAi Agent Companion")
-        logger.info("Notification shown successfully")
-    except Exception as e:
-        logger.error(f"Error showing notification: {str(e)}")
-        logger.error(traceback.format_exc())
+    start_notification_thread()
+    _notify_queue.put((icon, message))
 
 # Better event handlers that don't return None
 def on_closed():
@@ -726,6 +795,7 @@ def on_closed():
         if _window:
             _window.hide()
             logger.info("Window hidden successfully")
+            _tray_check_event.set()
             
             # No notification on close, only on minimize
     except Exception as e:
@@ -743,6 +813,7 @@ def on_minimized():
         if _window:
             _window.hide()
             logger.info("Window hide command sent")
+            _tray_check_event.set()
             
             # Show notification using the system tray icon
             global _tray_icon
@@ -751,52 +822,53 @@ def on_minimized():
                 notify_minimized_to_tray(_tray_icon)
             else:
                 logger.warning("No tray icon available for notification")
-    except Exception as e:
-        logger.error(f"Error in on_minimized handler: {str(e)}")
-        logger.error(traceback.format_exc())
+    except Exception:
+        logger.exception("Error in on_minimized handler")
     
     # Return True to prevent default minimization
     return True
 
 # Clean initialization of event handlers
+_handlers_installed = False
+
 def setup_window_events(window_instance):
+    global _handlers_installed
+    # Subscribing twice would hide the window and notify twice per event
+    if _handlers_installed:
+        return True
+    
     logger.info("Setting up window event handlers")
     
     try:
         # Add our handlers
         window_instance.events.closed += on_closed
         window_instance.events.minimized += on_minimized
+        _handlers_installed = True
         
         logger.info("Window event handlers set up successfully")
         return True
-    except Exception as e:
-        logger.error(f"Error setting up window events: {str(e)}")
-        logger.error(traceback.format_exc())
-        
-        # As a fallback, try the direct approach without clearing
-        try:
-            window_instance.events.closed += on_closed
-            window_instance.events.minimized += on_minimized
-            logger.info("Applied event handlers with fallback method")
-            return True
-        except Exception as e2:
-            logger.error(f"Fallback also failed: {str(e2)}")
-            return False
+    except Exception:
+        logger.exception("Error setting up window events")
+        return False
 
 # Ensure system tray is running properly at startup
 def ensure_system_tray_running():
     global _tray_icon, _window
     
+    # Healthy tray: nothing to do
+    if _tray_icon is not None and getattr(_tray_icon, 'visible', True):
+        return True
+
     if _tray_icon is None:
         logger.warning("System tray icon not initialized - attempting to setup")
-        _tray_icon = setup_system_tray(_window)
+        _tray_icon = setup_system_tray()
         if _tray_icon is None:
             logger.error("Failed to create system tray icon after retry")
             return False
     
     # Test if tray icon is functional
     try:
-        if hasattr(_tray_icon, 'visible') and not _tray_icon.visible:
+        if not _tray_icon.visible:
             logger.warning("Tray icon not visible - attempting to restart")
             icon_thread = threading.Thread(target=_tray_icon.run, daemon=True)
             icon_thread.start()
@@ -821,7 +893,8 @@ def main():
     logger.info("Starting WebView window")
     
     try:
-        initialize_indicator(args.port)
+        import webview as pywebview
+
         # Check if we should start minimized (only when --background flag is used)
         start_hidden = args.background
         logger.info(f"Window will start {'hidden' if start_hidden else 'visible'}")
@@ -841,26 +914,30 @@ def main():
         )
         
         logger.info(f"Window created successfully. Hidden: {start_hidden}")
-        
-        # Set up the system tray first before setting up events
-        _tray_icon = setup_system_tray(_window)
+
+        # Set up the system tray first before setting up events; in
+        # background mode the tray is the only UI, so it comes up before
+        # anything else
+        _tray_icon = setup_system_tray()
         logger.info(f"System tray setup result: {_tray_icon is not None}")
         
-        # Add direct event handlers
-        _window.events.closed += on_closed
-        _window.events.minimized += on_minimized
-        logger.info("Event handlers connected directly")
+        setup_window_events(_window)
+        
+        # Visible-window setup only subscribes to the shown event here, so a
+        # --background start doesn't pay for it until the window is restored
+        # Bring up the LLM control indicator after the main window appears
+        initialize_indicator(_window, args.port)
         
         # Apply window theme
         if sys.platform == "win32":
             set_window_theme_attribute(_window)
-            apply_dark_mode_to_all_windows()
         
-        # Run the main loop to ensure tray icon is active
-        # Add a thread to periodically check system tray status
+        # Add a thread to check the system tray status whenever the window
+        # goes to the tray, with an infrequent periodic check as a fallback
         def monitor_tray():
             while True:
-                time.sleep(5)  # Check every 5 seconds
+                _tray_check_event.wait(timeout=TRAY_CHECK_INTERVAL)
+                _tray_check_event.clear()
                 ensure_system_tray_running()
         
         monitor_thread = threading.Thread(target=monitor_tray, daemon=True)
@@ -868,16 +945,12 @@ def main():
         
         # Start webview
         logger.info("Starting webview")
-        if sys.platform == "win32":
-            try:
-                # Check if we can use winforms
-                import webview.platforms.winforms
-                pywebview.start(gui="winforms")
-            except Exception as e:
-                logger.error(f"Could not use winforms: {str(e)}")
-                pywebview.start()
-        else:
-            pywebview.start()
+        # Check if we can use winforms without importing it (and the CLR);
+        # pywebview loads the backend itself when it starts
+        gui = None
+        if sys.platform == "win32" and importlib.util.find_spec("webview.platforms.winforms") is not None:
+            gui = "winforms"
+        pywebview.start(gui=gui)
         
     except Exception as e:
         logger.error(f"Error starting WebView: {str(e)}")
@@ -890,9 +963,6 @@ if __name__ == "__main__":
         logger.info("Starting HevolveAi Agent Companion GUI Application")
         logger.info(f"Arguments: {sys.argv}")
         
-        # Ensure we're in the right directory when started from registry
-        ensure_working_directory()
-        
         # Add a small delay when started in background mode
         if args.background:
             logger.info("Background mode enabled, adding startup delay")
@@ -905,7 +975,7 @@ if __name__ == "__main__":
         # Hide console window in background mode
         if sys.platform == "win32" and args.background:
             try:
-                ctypes.windll.user32.ShowWindow(ctypes.windll.kernel32.GetConsoleWindow(), 0)
+                _ShowWindow(_GetConsoleWindow(), 0)  # SW_HIDE
                 logger.info("Console window hidden in background mode")
             except Exception as e:
                 logger.error(f"Failed to hide console window: {str(e)}")
@@ -918,9 +988,7 @@ if __name__ == "__main__":
         
         # Create a visible error log if something went wrong at startup
         try:
-            error_dir = os.path.join(os.path.expanduser('~'), 'Documents', 'HevolveAi Agent Companion', 'logs')
-            os.makedirs(error_dir, exist_ok=True)
-            error_file = os.path.join(error_dir, 'startup_error.log')
+            error_file = os.path.join(log_dir, 'startup_error.log')
             with open(error_file, 'a') as f:
                 f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} - Startup Error: {str(e)}\n")
                 f.write(traceback.format_exc())
@@ -942,5 +1010,9 @@ curl -X POST http://localhost:5000/api/storage/set \
 curl -X GET http://localhost:5000/api/storage/get/email_address
 curl -X GET http://localhost:5000/api/storage/get/user_id
 curl -X GET http://localhost:5000/api/storage/get/access_token
+
+curl -X POST http://localhost:5000/api/storage/get_batch \
+  -H "Content-Type: application/json" \
+  -d '{"keys": ["agentname", "user_id", "access_token", "email"]}'
   
   """
\ No newline at end of file
@@ -10,6 +10,9 @@ import winreg
 import subprocess
 import traceback
 import ctypes
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from importlib import metadata
 from pathlib import Path
 
 def is_admin():
@@ -19,6 +22,102 @@ def is_admin():
     except:
         return False
 
+# Startup entry records. to_json() gives the dict layout written to the
+# diagnostics JSON file.
+@dataclass
+class RegistryEntry:
+    location: str
+    name: str
+    value: str
+    
+    def to_json(self):
+        return {"type": "registry", "location": self.location, "name": self.name, "value": self.value}
+
+@dataclass
+class FolderEntry:
+    location: str
+    name: str
+    path: str
+    
+    def to_json(self):
+        return {"type": "folder", "location": self.location, "name": self.name, "path": self.path}
+
+@dataclass
+class TaskEntry:
+    task_name: str
+    details: dict = field(default_factory=dict)  # Other task fields, keyed as schtasks names them
+    
+    def to_json(self):
+        return {"type": "task", "TaskName": self.task_name, **self.details}
+
+@dataclass
+class ErrorEntry:
+    location: str
+    error: str
+    
+    def to_json(self):
+        return {"type": "error", "location": self.location, "error": self.error}
+
+# IRegisteredTask.State values
+TASK_STATES = {0: "Unknown", 1: "Disabled", 2: "Queued", 3: "Ready", 4: "Running"}
+TASK_ENUM_HIDDEN = 1
+
+def _list_app_tasks():
+    import win32com.client
+    
+    scheduler = win32com.client.Dispatch("Schedule.Service")
+    scheduler.Connect()
+    tasks = []
+    # schtasks lists every folder, so walk the subfolders as well as the root
+    folders = [scheduler.GetFolder("\\")]
+    while folders:
+        folder = folders.pop()
+        folders.extend(folder.GetFolders(0))
+        # Only the task names are compared; details are read for matches alone
+        for task in folder.GetTasks(TASK_ENUM_HIDDEN):
+            if "HevolveAi" in task.Name:
+                tasks.append(TaskEntry(task.Path, {
+                    "Status": TASK_STATES.get(task.State, "Unknown"),
+                    "Last Run Time": str(task.LastRunTime),
+                    "Last Result": str(task.LastTaskResult)
+                }))
+    return tasks
+
+def get_scheduled_tasks_com():
+    """Get the app's scheduled tasks from the Task Scheduler COM API"""
+    import pythoncom
+    
+    # Runs on a diagnostics worker thread, which has no COM apartment yet;
+    # the COM objects live in _list_app_tasks and are released before uninit
+    pythoncom.CoInitialize()
+    try:
+        return _list_app_tasks()
+    finally:
+        pythoncom.CoUninitialize()
+
+def get_scheduled_tasks_schtasks():
+    """Get the app's scheduled tasks by parsing schtasks output"""
+    tasks = []
+    current_task = None
+    # Stream the listing and only split the fields of matching task blocks;
+    # every other task is skipped from its TaskName line onwards
+    process = subprocess.Popen(["schtasks", "/query", "/fo", "list", "/v"], stdout=subprocess.PIPE, text=True)
+    with process.stdout:
+        for line in process.stdout:
+            if line.startswith("TaskName:"):
+                if current_task is not None:
+                    tasks.append(current_task)
+                task_name = line.split(":", 1)[1].strip()
+                current_task = TaskEntry(task_name) if "HevolveAi" in task_name else None
+            elif current_task is not None and ":" in line:
+                key, value = line.split(":", 1)
+                current_task.details[key.strip()] = value.strip()
+    if current_task is not None:
+        tasks.append(current_task)
+    if process.wait():
+        raise subprocess.CalledProcessError(process.returncode, process.args)
+    return tasks
+
 def get_startup_entries():
     """Get all startup entries from registry and startup folder"""
     entries = []
@@ -31,17 +130,18 @@ def get_startup_entries():
     
     for hkey, path in reg_paths:
         try:
-            key = winreg.OpenKey(hkey, path)
-            i = 0
-            while True:
-                try:
+            with winreg.OpenKey(hkey, path, 0, winreg.KEY_READ) as key:
+                # Ask for the value count up front instead of enumerating
+                # until EnumValue raises
+                value_count = winreg.QueryInfoKey(key)[1]
+                location = f"{hkey}\\{path}"
+                key_entries = [None] * value_count
+                for i in range(value_count):
                     name, value, _ = winreg.EnumValue(key, i)
-                    entries.append({"type": "registry", "location": f"{hkey}\\{path}", "name": name, "value": value})
-                    i += 1
-                except WindowsError:
-                    break
+                    key_entries[i] = RegistryEntry(location, name, value)
+                entries.extend(key_entries)
         except Exception as e:
-            entries.append({"type": "error", "location": f"{hkey}\\{path}", "error": str(e)})
+            entries.append(ErrorEntry(f"{hkey}\\{path}", str(e)))
     
     # Check startup folders
     startup_folders = [
@@ -52,29 +152,21 @@ def get_startup_entries():
     for folder in startup_folders:
         try:
             if os.path.exists(folder):
-                for file in os.listdir(folder):
-                    file_path = os.path.join(folder, file)
-                    entries.append({"type": "folder", "location": folder, "name": file, "path": file_path})
+                with os.scandir(folder) as folder_entries:
+                    for entry in folder_entries:
+                        entries.append(FolderEntry(folder, entry.name, entry.path))
         except Exception as e:
-            entries.append({"type": "error", "location": folder, "error": str(e)})
+            entries.append(ErrorEntry(folder, str(e)))
     
     # Check scheduled tasks
     try:
-        output = subprocess.check_output(["schtasks", "/query", "/fo", "list", "/v"], text=True)
-        lines = output.split('\n')
-        current_task = {}
-        for line in lines:
-            if line.startswith("TaskName:"):
-                if current_task and "HevolveAi" in current_task.get("TaskName", ""):
-                    entries.append({"type": "task", **current_task})
-                current_task = {"TaskName": line.split(":", 1)[1].strip()}
-            elif ":" in line and current_task:
-                key, value = line.split(":", 1)
-                current_task[key.strip()] = value.strip()
-        if current_task and "HevolveAi" in current_task.get("TaskName", ""):
-            entries.append({"type": "task", **current_task})
+        try:
+            entries.extend(get_scheduled_tasks_com())
+        except Exception:
+            # Task Scheduler COM (or pywin32) unavailable, parse schtasks instead
+            entries.extend(get_scheduled_tasks_schtasks())
     except Exception as e:
-        entries.append({"type": "error", "location": "scheduled tasks", "error": str(e)})
+        entries.append(ErrorEntry("scheduled tasks", str(e)))
     
     return entries
 
@@ -92,7 +184,8 @@ def check_exe_permissions(exe_path):
             si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
             si.wShowWindow = 0  # SW_HIDE
             
-            # Try to start the process but immediately terminate it
+            # Try to start the process; --help exits on its own, so only
+            # wait for it as long as it needs, up to half a second
             process = subprocess.Popen(
                 [exe_path, "--help"], 
                 stdout=subprocess.PIPE,
@@ -100,11 +193,12 @@ def check_exe_permissions(exe_path):
                 startupinfo=si,
                 creationflags=subprocess.CREATE_NO_WINDOW
             )
-            time.sleep(0.5)  # Give it a moment to start
             try:
-                process.terminate()
-            except:
-                pass
+                process.communicate(timeout=0.5)
+            except subprocess.TimeoutExpired:
+                # Still running means it started, which is all we check
+                process.kill()
+                process.communicate()
             
             result["executable"] = True
         else:
@@ -116,27 +210,28 @@ def check_exe_permissions(exe_path):
     
     return result
 
+# Distribution names for dependencies whose import name differs
+DEPENDENCY_DISTRIBUTIONS = {"PIL": "Pillow"}
+
 def check_dependencies():
     """Check if key dependencies are available"""
     dependencies = [
-        "pystray", "PIL", "pywebview", "flask", "flask_cors"
+        "pystray", "PIL", "pywebview", "flask"
     ]
     
     results = {}
     for dep in dependencies:
+        # Installed package metadata answers this without importing anything
+        try:
+            results[dep] = {"available": True, "version": metadata.version(DEPENDENCY_DISTRIBUTIONS.get(dep, dep))}
+            continue
+        except metadata.PackageNotFoundError:
+            pass
+        
+        # No metadata (e.g. a frozen build), fall back to importing the module
         try:
-            if dep == "PIL":
-                try:
-                    import PIL
-                    results[dep] = {"available": True, "version": PIL.__version__}
-                except:
-                    results[dep] = {"available": False, "error": "Import error"}
-            else:
-                module = __import__(dep)
-                if hasattr(module, "__version__"):
-                    results[dep] = {"available": True, "version": module.__version__}
-                else:
-                    results[dep] = {"available": True, "version": "Unknown"}
+            module = __import__(dep)
+            results[dep] = {"available": True, "version": getattr(module, "__version__", "Unknown")}
         except ImportError:
             results[dep] = {"available": False, "error": "Not installed"}
         except Exception as e:
@@ -189,128 +284,144 @@ def run_diagnostics():
             exe_files = [f for f in os.listdir(app_dir) if f.endswith(".exe")]
             exe_path = os.path.join(app_dir, exe_files[0]) if exe_files else None
         
-        # Collect diagnostic information
-        diagnostics = {
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "app_dir": app_dir,
-            "exe_path": exe_path,
-            "startup_entries": get_startup_entries(),
-            "exe_permissions": check_exe_permissions(exe_path) if exe_path else {"error": "No exe found"},
-            "dependencies": check_dependencies(),
-            "environment": check_environment()
-        }
+        # Collect diagnostic information. The probes are independent and
+        # mostly wait on the registry, subprocesses and the disk, so run
+        # them side by side.
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            startup_entries = executor.submit(get_startup_entries)
+            exe_permissions = executor.submit(check_exe_permissions, exe_path) if exe_path else None
+            dependencies = executor.submit(check_dependencies)
+            environment = executor.submit(check_environment)
+            
+            diagnostics = {
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "app_dir": app_dir,
+                "exe_path": exe_path,
+                "startup_entries": startup_entries.result(),
+                "exe_permissions": exe_permissions.result() if exe_permissions else {"error": "No exe found"},
+                "dependencies": dependencies.result(),
+                "environment": environment.result()
+            }
         
         # Save results to user's desktop
         desktop_path = os.path.join(os.path.expanduser("~"), "Documents")
         output_file = os.path.join(desktop_path, "hevolveai_startup_diagnostics.json")
         
+        # Serialize first so the file is written in a single call
+        diagnostics_json = json.dumps(diagnostics, indent=2, default=lambda entry: entry.to_json())
         with open(output_file, "w") as f:
-            json.dump(diagnostics, f, indent=2)
+            f.write(diagnostics_json)
         
         print(f"Diagnostics saved to: {output_file}")
         
         # Create a more human-readable summary
         summary_file = os.path.join(desktop_path, "hevolveai_startup_summary.txt")
         
+        # Build the summary in memory and write it out in one call
+        parts = []
+        parts.append("HevolveAI Agent Companion Startup Diagnostics\n")
+        parts.append("===========================================\n\n")
+        
+        parts.append(f"Time: {diagnostics['timestamp']}\n")
+        parts.append(f"Application directory: {diagnostics['app_dir']}\n")
+        parts.append(f"Executable path: {diagnostics['exe_path']}\n\n")
+        
+        parts.append("Startup Entries:\n")
+        for entry in diagnostics['startup_entries']:
+            if isinstance(entry, RegistryEntry):
+                parts.append(f"  Registry: {entry.name} = {entry.value}\n")
+            elif isinstance(entry, FolderEntry):
+                parts.append(f"  Folder: {entry.location}\\{entry.name}\n")
+            elif isinstance(entry, TaskEntry):
+                parts.append(f"  Task: {entry.task_name}\n")
+                parts.append(f"    Status: {entry.details.get('Status', 'Unknown')}\n")
+                parts.append(f"    Last run: {entry.details.get('Last Run Time', 'Unknown')}\n")
+                parts.append(f"    Last result: {entry.details.get('Last Result', 'Unknown')}\n")
+        
+        parts.append("\nExecutable Check:\n")
+        exe_check = diagnostics['exe_permissions']
+        if exe_check.get('exists', False):
+            parts.append(f"  File exists: Yes (Size: {exe_check.get('size', 'Unknown')} bytes)\n")
+            parts.append(f"  Can execute: {'Yes' if exe_check.get('executable', False) else 'No'}\n")
+            if 'error' in exe_check:
+                parts.append(f"  Error: {exe_check['error']}\n")
+        else:
+            parts.append(f"  File exists: No\n")
+            if 'error' in exe_check:
+                parts.append(f"  Error: {exe_check['error']}\n")
+        
+        parts.append("\nDependencies:\n")
+        for dep, info in diagnostics['dependencies'].items():
+            status = "Installed" if info.get('available', False) else "Missing"
+            version = info.get('version', 'Unknown')
+            parts.append(f"  {dep}: {status}")
+            if status == "Installed":
+                parts.append(f" (Version: {version})")
+            if 'error' in info:
+                parts.append(f" - Error: {info['error']}")
+            parts.append("\n")
+        
+        parts.append("\nEnvironment:\n")
+        env = diagnostics['environment']
+        parts.append(f"  Python version: {env.get('python_version', 'Unknown')}\n")
+        parts.append(f"  Platform: {env.get('platform', 'Unknown')}\n")
+        parts.append(f"  Current directory: {env.get('cwd', 'Unknown')}\n")
+        parts.append(f"  Running as frozen app: {'Yes' if env.get('is_frozen', False) else 'No'}\n")
+        parts.append(f"  Running as admin: {'Yes' if env.get('is_admin', False) else 'No'}\n")
+        parts.append(f"  Documents folder writable: {'Yes' if env.get('documents_writable', False) else 'No'}\n")
+        if not env.get('documents_writable', False) and 'documents_error' in env:
+            parts.append(f"    Error: {env['documents_error']}\n")
+        
+        parts.append("\nPossible issues:\n")
+        issues = []
+        
+        # Check for specific issues
+        if not exe_check.get('exists', False):
+            issues.append("- Executable file not found")
+        elif not exe_check.get('executable', False):
+            issues.append("- Executable file cannot be run")
+        
+        if not any(isinstance(entry, RegistryEntry) and 'HevolveAi' in entry.name for entry in diagnostics['startup_entries']):
+            issues.append("- No registry startup entry found")
+        
+        if not any(isinstance(entry, TaskEntry) and 'HevolveAi' in entry.task_name for entry in diagnostics['startup_entries']):
+            issues.append("- No scheduled task found")
+        
+        if not env.get('documents_writable', False):
+            issues.append("- Cannot write to Documents folder")
+        
+        missing_deps = [dep for dep, info in diagnostics['dependencies'].items() if not info.get('available', False)]
+        if missing_deps:
+            issues.append(f"- Missing dependencies: {', '.join(missing_deps)}")
+        
+        if not issues:
+            issues.append("- No obvious issues detected")
+        
+        for issue in issues:
+            parts.append(f"{issue}\n")
+        
+        issues_str = ' '.join(issues)
+        
+        parts.append("\nRecommended fixes:\n")
+        if "Executable file not found" in issues[0]:
+            parts.append("- Reinstall the application\n")
+        elif "Executable file cannot be run" in issues[0]:
+            parts.append("- Make sure anti-virus is not blocking the application\n")
+            parts.append("- Try running the application manually with administrator rights once\n")
+        
+        if "No registry startup entry found" in issues_str and "No scheduled task found" in issues_str:
+            parts.append("- Reinstall the application or manually add it to startup:\n")
+            parts.append(f"  - Create a shortcut to {diagnostics['exe_path']} in the startup folder\n")
+            parts.append(f"  - Or run: REG ADD HKCU\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Run /v HevolveAiAgentCompanion /t REG_SZ /d \"\\\"{diagnostics['exe_path']}\\\" --background\" /f\n")
+        
+        if "Cannot write to Documents folder" in issues_str:
+            parts.append("- Check user permissions for the Documents folder\n")
+        
+        if missing_deps:
+            parts.append("- Reinstall the application to restore missing dependencies\n")
+        
         with open(summary_file, "w") as f:
-            f.write("HevolveAI Agent Companion Startup Diagnostics\n")
-            f.write("===========================================\n\n")
-            
-            f.write(f"Time: {diagnostics['timestamp']}\n")
-            f.write(f"Application directory: {diagnostics['app_dir']}\n")
-            f.write(f"Executable path: {diagnostics['exe_path']}\n\n")
-            
-            f.write("Startup Entries:\n")
-            for entry in diagnostics['startup_entries']:
-                if entry['type'] == 'registry':
-                    f.write(f"  Registry: {entry['name']} = {entry['value']}\n")
-                elif entry['type'] == 'folder':
-                    f.write(f"  Folder: {entry['location']}\\{entry['name']}\n")
-                elif entry['type'] == 'task':
-                    f.write(f"  Task: {entry.get('TaskName', 'Unknown')}\n")
-                    f.write(f"    Status: {entry.get('Status', 'Unknown')}\n")
-                    f.write(f"    Last run: {entry.get('Last Run Time', 'Unknown')}\n")
-                    f.write(f"    Last result: {entry.get('Last Result', 'Unknown')}\n")
-            
-            f.write("\nExecutable Check:\n")
-            exe_check = diagnostics['exe_permissions']
-            if exe_check.get('exists', False):
-                f.write(f"  File exists: Yes (Size: {exe_check.get('size', 'Unknown')} bytes)\n")
-                f.write(f"  Can execute: {'Yes' if exe_check.get('executable', False) else 'No'}\n")
-                if 'error' in exe_check:
-                    f.write(f"  Error: {exe_check['error']}\n")
-            else:
-                f.write(f"  File exists: No\n")
-                if 'error' in exe_check:
-                    f.write(f"  Error: {exe_check['error']}\n")
-            
-            f.write("\nDependencies:\n")
-            for dep, info in diagnostics['dependencies'].items():
-                status = "Installed" if info.get('available', False) else "Missing"
-                version = info.get('version', 'Unknown')
-                f.write(f"  {dep}: {status}")
-                if status == "Installed":
-                    f.write(f" (Version: {version})")
-                if 'error' in info:
-                    f.write(f" - Error: {info['error']}")
-                f.write("\n")
-            
-            f.write("\nEnvironment:\n")
-            env = diagnostics['environment']
-            f.write(f"  Python version: {env.get('python_version', 'Unknown')}\n")
-            f.write(f"  Platform: {env.get('platform', 'Unknown')}\n")
-            f.write(f"  Current directory: {env.get('cwd', 'Unknown')}\n")
-            f.write(f"  Running as frozen app: {'Yes' if env.get('is_frozen', False) else 'No'}\n")
-            f.write(f"  Running as admin: {'Yes' if env.get('is_admin', False) else 'No'}\n")
-            f.write(f"  Documents folder writable: {'Yes' if env.get('documents_writable', False) else 'No'}\n")
-            if not env.get('documents_writable', False) and 'documents_error' in env:
-                f.write(f"    Error: {env['documents_error']}\n")
-            
-            f.write("\nPossible issues:\n")
-            issues = []
-            
-            # Check for specific issues
-            if not exe_check.get('exists', False):
-                issues.append("- Executable file not found")
-            elif not exe_check.get('executable', False):
-                issues.append("- Executable file cannot be run")
-            
-            if not any(entry['type'] == 'registry' and 'HevolveAi' in entry['name'] for entry in diagnostics['startup_entries']):
-                issues.append("- No registry startup entry found")
-            
-            if not any(entry['type'] == 'task' and 'HevolveAi' in entry.get('TaskName', '') for entry in diagnostics['startup_entries']):
-                issues.append("- No scheduled task found")
-            
-            if not env.get('documents_writable', False):
-                issues.append("- Cannot write to Documents folder")
-            
-            missing_deps = [dep for dep, info in diagnostics['dependencies'].items() if not info.get('available', False)]
-            if missing_deps:
-                issues.append(f"- Missing dependencies: {', '.join(missing_deps)}")
-            
-            if not issues:
-                issues.append("- No obvious issues detected")
-            
-            for issue in issues:
-                f.write(f"{issue}\n")
-            
-            f.write("\nRecommended fixes:\n")
-            if "Executable file not found" in issues[0]:
-                f.write("- Reinstall the application\n")
-            elif "Executable file cannot be run" in issues[0]:
-                f.write("- Make sure anti-virus is not blocking the application\n")
-                f.write("- Try running the application manually with administrator rights once\n")
-            
-            if "No registry startup entry found" in ' '.join(issues) and "No scheduled task found" in ' '.join(issues):
-                f.write("- Reinstall the application or manually add it to startup:\n")
-                f.write(f"  - Create a shortcut to {diagnostics['exe_path']} in the startup folder\n")
-                f.write(f"  - Or run: REG ADD HKCU\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Run /v HevolveAiAgentCompanion /t REG_SZ /d \"\\\"{diagnostics['exe_path']}\\\" --background\" /f\n")
-            
-            if "Cannot write to Documents folder" in ' '.join(issues):
-                f.write("- Check user permissions for the Documents folder\n")
-            
-            if missing_deps:
-                f.write("- Reinstall the application to restore missing dependencies\n")
+            f.write("".join(parts))
         
         print(f"Summary saved to: {summary_file}")
         
@@ -3,13 +3,46 @@ import sys
 import shutil
 import zipfile
 import tempfile
+import urllib.error
 import urllib.request
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # Copy the response in 1 MiB blocks
+DOWNLOAD_TIMEOUT = 30  # Seconds before a stalled connection gives up
+# Parts of a Python distribution the embedded runtime never needs
+SKIPPED_MEMBER_PREFIXES = ('Doc/', 'Tools/', 'Lib/test/', 'Lib/unittest/test/')
+# Packages installed into the embedded Python
+REQUIRED_PACKAGES = ["pyautogui", "pillow", "pyperclip", "keyboard", "requests"]
+# Wheels are fetched here once and installed from it without contacting PyPI
+WHEEL_CACHE_DIR = os.path.join(tempfile.gettempdir(), "hai_wheels")
+WHEEL_CACHE_MARKER = os.path.join(WHEEL_CACHE_DIR, ".complete")
 
 def download_file(url, save_path):
     """Download a file from URL to the specified path"""
     print(f"Downloading {url} to {save_path}...")
-    urllib.request.urlretrieve(url, save_path)
+    # Download into a .part file so save_path only ever holds a complete
+    # file, and an interrupted download can be resumed on the next run
+    part_path = save_path + ".part"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    
+    request = urllib.request.Request(url)
+    if offset:
+        request.add_header("Range", f"bytes={offset}-")
+    
+    try:
+        with urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT) as response:
+            if offset and response.status != 206:
+                # Server ignored the range, start over
+                offset = 0
+            with open(part_path, 'ab' if offset else 'wb') as f:
+                shutil.copyfileobj(response, f, DOWNLOAD_CHUNK_SIZE)
+    except urllib.error.HTTPError as e:
+        # 416 means the partial file already holds the whole download
+        if not (offset and e.code == 416):
+            raise
+    
+    os.replace(part_path, save_path)
     print("Download complete!")
 
 def main():
@@ -26,14 +59,23 @@ def main():
     get_pip_py = os.path.join(tempfile.gettempdir(), "get-pip.py")
     
     try:
-        # Download Python embedded package
-        if not os.path.exists(py_embed_zip):
-            download_file(py_embed_url, py_embed_zip)
+        # Download the Python embedded package and get-pip.py in parallel
+        downloads = [(url, path) for url, path in ((py_embed_url, py_embed_zip), (get_pip_url, get_pip_py))
+                     if not os.path.exists(path)]
+        if downloads:
+            with ThreadPoolExecutor(max_workers=len(downloads)) as executor:
+                futures = [executor.submit(download_file, url, path) for url, path in downloads]
+                for future in futures:
+                    future.result()
         
         # Extract Python embedded package
         print(f"Extracting Python embedded package to {embed_dir}...")
-        with zipfile.ZipFile(py_embed_zip, 'r') as zip_ref:
-            zip_ref.extractall(embed_dir)
+        # zipfile copies each member through shutil.copyfileobj, whose
+        # default block size is read from COPY_BUFSIZE at call time
+        shutil.COPY_BUFSIZE = DOWNLOAD_CHUNK_SIZE
+        with zipfile.ZipFile(py_embed_zip, 'r', allowZip64=True) as zip_ref:
+            members = [name for name in zip_ref.namelist() if not name.startswith(SKIPPED_MEMBER_PREFIXES)]
+            zip_ref.extractall(embed_dir, members=members)
         
         # Modify python310._pth to include site-packages
         pth_file = os.path.join(embed_dir, "python310._pth")
@@ -47,25 +89,28 @@ def main():
         with open(pth_file, 'w') as f:
             f.write(content)
         
-        # Download get-pip.py
-        if not os.path.exists(get_pip_py):
-            download_file(get_pip_url, get_pip_py)
-        
         # Install pip
         python_exe = os.path.join(embed_dir, "python.exe")
         print("Installing pip...")
         subprocess.run([python_exe, get_pip_py, "--no-warn-script-location"], check=True)
         
+        # Fetch the required packages (with their dependencies) into the
+        # wheel cache, unless an earlier run already filled it
+        pip_exe = os.path.join(embed_dir, "Scripts", "pip.exe")
+        if not os.path.exists(WHEEL_CACHE_MARKER):
+            print("Downloading required packages...")
+            os.makedirs(WHEEL_CACHE_DIR, exist_ok=True)
+            subprocess.run([pip_exe, "download", "--dest", WHEEL_CACHE_DIR, *REQUIRED_PACKAGES], check=True)
+            open(WHEEL_CACHE_MARKER, 'w').close()
+        
         # Install required packages
         print("Installing required packages...")
         subprocess.run([
-            os.path.join(embed_dir, "Scripts", "pip.exe"), 
+            pip_exe, 
             "install", 
-            "pyautogui",
-            "pillow",
-            "pyperclip",
-            "keyboard",
-            "requests",
+            "--no-index",
+            f"--find-links={WHEEL_CACHE_DIR}",
+            *REQUIRED_PACKAGES,
             "--no-warn-script-location"
         ], check=True)
         
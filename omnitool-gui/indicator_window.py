@@ -3,60 +3,152 @@ import os
 import sys
 import threading
 import logging
+import logging.handlers
+import atexit
 import time
 import tkinter as tk
 from tkinter import ttk
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import queue
+from concurrent.futures import ThreadPoolExecutor
 import traceback
 
-# Try to import pyautogui for screen detection
-try:
-    import pyautogui
-    PYAUTOGUI_AVAILABLE = True
-except ImportError:
-    PYAUTOGUI_AVAILABLE = False
-
 # Configure logging
 user_docs = os.path.join(os.path.expanduser('~'), 'Documents')
 log_dir = os.path.join(user_docs, 'HevolveAi Agent Companion', 'logs')
 os.makedirs(log_dir, exist_ok=True)
 log_file = os.path.join(log_dir, 'indicator_window.log')
 
-logging.basicConfig(
-    filename=log_file,
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    filemode='a'
-)
+LOG_QUEUE_MAX = 1024
+
+def _put_dropping_oldest(q, item):
+    """Put item without blocking, dropping the oldest entry while q is full"""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+class DropOldestQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks: a full queue drops its oldest record"""
+    def enqueue(self, record):
+        _put_dropping_oldest(self.queue, record)
+
+class DropOldestQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose stop() can't raise queue.Full on a full queue"""
+    def enqueue_sentinel(self):
+        _put_dropping_oldest(self.queue, self._sentinel)
+
+# The Tk thread and the stop-API worker only enqueue records; a single
+# listener thread writes them to the file. The handler is attached to this
+# module's logger, so it also applies when the root logger was already
+# configured by the host application.
+file_handler = logging.FileHandler(log_file, mode='a')
+file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_queue = queue.Queue(LOG_QUEUE_MAX)
+log_listener = DropOldestQueueListener(log_queue, file_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
 
 logger = logging.getLogger('LLM_Control_Indicator_TK')
+logger.setLevel(logging.INFO)
+logger.addHandler(DropOldestQueueHandler(log_queue))
 
 # Global variables
 indicator_window = None
 indicator_active = False
 control_start_time = None
 server_port = 5000
+ACTIVITY_TIMEOUT = 15.0  # Seconds before a shown indicator hides itself
+
+# Shared HTTP session, so repeated calls to the local server reuse one
+# keep-alive connection instead of opening a new socket each time.
+# (connect, read) timeouts keep a hung server from tying up the caller.
+STOP_API_TIMEOUT = (1.0, 3.0)
+_http_session = requests.Session()
+_http_session.mount('http://', HTTPAdapter(
+    pool_connections=2, pool_maxsize=4,
+    max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504])))
+_http_session.headers.update({'Accept': 'application/json'})
 
-def get_screen_size():
-    """Helper function to get screen size"""
+# One reusable worker for stop requests; repeated clicks queue up behind it
+_api_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='stop-api')
+
+# All periodic work runs off one Tk timer; the periods below are in ticks
+TICK_MS = 100
+TAB_PULSE_TICKS = 2         # Tab alpha pulse step, every 200ms
+PULSE_TICKS = 8             # Panel pulse dot, ~0.8s per blink
+TIMER_TICKS = 10            # Elapsed-time label, once a second
+AUTO_HIDE_TICKS = 50        # Auto-hide check, every 5s (timeout is 15s)
+AUTO_COLLAPSE_TICKS = 200   # Collapse the panel after 20s without activity
+COLLAPSE_RESET_TICKS = 5    # Re-arm auto-collapse at most every 500ms
+
+# Panel animations follow the wall clock, so late timer callbacks skip
+# ahead instead of stretching the animation
+ANIMATION_FRAME_MS = 16
+EXPAND_DURATION = 0.25      # Seconds
+COLLAPSE_DURATION = 0.12    # Seconds
+
+_screen_size = None  # Cached (width, height) from the first successful probe
+
+def get_screen_size(root=None):
+    """Helper function to get screen size, from root when a Tk root is already live"""
+    global _screen_size
+    if _screen_size is not None:
+        return _screen_size
+    
+    size = _probe_screen_size(root)
+    if size is None:
+        # Not cached, so a later call can still find the real size
+        return 1920, 1080
+    _screen_size = size
+    return size
+
+def _probe_screen_size(root):
+    """Query the screen size from the cheapest available source, or None"""
     try:
-        if PYAUTOGUI_AVAILABLE:
-            width, height = pyautogui.size()
-            logger.info(f"Got screen size from pyautogui: {width}x{height}")
+        if sys.platform == "win32":
+            import ctypes
+            user32 = ctypes.windll.user32
+            width, height = user32.GetSystemMetrics(0), user32.GetSystemMetrics(1)  # SM_CXSCREEN, SM_CYSCREEN
+            if width and height:
+                logger.info(f"Got screen size from GetSystemMetrics: {width}x{height}")
+                return width, height
+        
+        if root is not None:
+            width = root.winfo_screenwidth()
+            height = root.winfo_screenheight()
+            logger.info(f"Got screen size from tkinter: {width}x{height}")
             return width, height
         
         # Fallback using tkinter
-        root = tk.Tk()
-        width = root.winfo_screenwidth()
-        height = root.winfo_screenheight()
-        root.destroy()
-        logger.info(f"Got screen size from tkinter: {width}x{height}")
+        try:
+            root = tk.Tk()
+        except tk.TclError:
+            root = None
+        if root is not None:
+            width = root.winfo_screenwidth()
+            height = root.winfo_screenheight()
+            root.destroy()
+            logger.info(f"Got screen size from tkinter: {width}x{height}")
+            return width, height
+        
+        # pyautogui pulls in PIL and friends, so only import it as a last resort
+        import pyautogui
+        width, height = pyautogui.size()
+        logger.info(f"Got screen size from pyautogui: {width}x{height}")
         return width, height
         
     except Exception as e:
         logger.warning(f"Error detecting screen size: {str(e)}, using default")
-        return 1920, 1080
+        return None
 
 class RibbonIndicator:
     def __init__(self, server_port=5000):
@@ -68,13 +160,26 @@ class RibbonIndicator:
         self.panel_window = None
         self.start_time = time.time()
         self.timer_label = None
-        self.auto_collapse_timer = None
-        self.pulse_animation = None
+        self._last_time_str = None  # Text currently shown by timer_label
+        self.auto_collapse_deadline = None  # Tick count at which the panel collapses
+        self._last_reset = None  # Tick count of the last auto-collapse re-arm
         self.is_hovering = False
         self.animation_cancelled = False  # New flag to handle animation cancellation
+        self.tick_job = None
+        self.tick_count = 0
+        # Tracked here so periodic callbacks skip a winfo_exists() round trip;
+        # panel_window is likewise reset to None whenever the panel is destroyed
+        self._tab_alive = False
+        self._panel_alive = False
+        self.auto_hide_enabled = not globals().get('STANDALONE_TEST_MODE', False)
+        
+        # One hidden Tk root (a single Tcl interpreter) owns every window
+        self._root = tk.Tk()
+        self._tk_thread = threading.current_thread()
+        self._root.withdraw()
         
         # Get screen dimensions
-        self.screen_width, self.screen_height = get_screen_size()
+        self.screen_width, self.screen_height = get_screen_size(self._root)
         
         # Ribbon tab dimensions (only the pull tab, no bar)
         self.tab_width = 30       # Slightly larger pull tab
@@ -92,12 +197,79 @@ class RibbonIndicator:
         
         # Create only the ribbon tab (no main bar)
         self.create_ribbon_tab()
+        
+        if not self.auto_hide_enabled:
+            logger.info("Auto-hide disabled in standalone test mode")
+        self.start_ticker()
+    
+    def _on_tk_thread(self, func):
+        """Run func on the Tk thread, scheduling it there when called from another"""
+        if threading.current_thread() is self._tk_thread:
+            func()
+        else:
+            self._root.after(0, func)
+    
+    def start_ticker(self):
+        """Start the shared periodic timer if it isn't running"""
+        if self.tick_job is None and self.ribbon_window:
+            self.tick_job = self.ribbon_window.after(TICK_MS, self.tick)
+    
+    def stop_ticker(self):
+        """Stop the shared periodic timer"""
+        if self.tick_job is not None:
+            try:
+                self.ribbon_window.after_cancel(self.tick_job)
+            except Exception:
+                pass
+            self.tick_job = None
+    
+    def tick(self):
+        """Run whichever periodic work is due on this tick"""
+        self.tick_count += 1
+        count = self.tick_count
+        
+        try:
+            # The tab only pulses while it is idle: not hovered, panel closed
+            if count % TAB_PULSE_TICKS == 0 and not (self.is_hovering or self.expanded):
+                self.animate_tab_pulse()
+            
+            if self.expanded and not self.is_animating:
+                if count % PULSE_TICKS == 0:
+                    self.animate_pulse()
+                if count % TIMER_TICKS == 0:
+                    self.update_timer()
+                if self.auto_collapse_deadline is not None and count >= self.auto_collapse_deadline:
+                    self.auto_collapse_deadline = None
+                    self.collapse_panel()
+            
+            if self.auto_hide_enabled and count % AUTO_HIDE_TICKS == 0:
+                self.check_auto_hide()
+        except Exception as e:
+            logger.error("Error in indicator tick: %s", e)
+        
+        # hide() stops the ticker, possibly from within this tick
+        if self.tick_job is not None:
+            self.tick_job = self.ribbon_window.after(TICK_MS, self.tick)
+    
+    def check_auto_hide(self):
+        """Automatically hide the indicator after inactivity"""
+        global control_start_time
+        
+        try:
+            if indicator_active and control_start_time:
+                elapsed = time.time() - control_start_time
+                if elapsed > ACTIVITY_TIMEOUT:
+                    logger.info("Auto-hiding indicator after %.1fs of inactivity", elapsed)
+                    hide_indicator()
+                    control_start_time = time.time()
+        except Exception as e:
+            logger.error(f"Error in auto-hide check: {str(e)}")
     
     def create_ribbon_tab(self):
         """Create only the pull tab - no main ribbon bar"""
         try:
             # Create the pull tab window
-            self.ribbon_window = tk.Tk()
+            self.ribbon_window = tk.Toplevel(self._root)
             self.ribbon_window.title("AI Control Tab")
             self.ribbon_window.geometry(f"{self.tab_width}x{self.tab_height}+{self.tab_x}+{self.tab_y}")
             self.ribbon_window.overrideredirect(True)
@@ -124,14 +296,20 @@ class RibbonIndicator:
             )
             tab_label.pack(expand=True)
             
+            # Kept for update_tab_appearance
+            self._tab_frame = tab_frame
+            self._tab_label = tab_label
+            
             # Bind events to all components
             for widget in [self.ribbon_window, tab_frame, tab_label]:
                 widget.bind('<Button-1>', self.toggle_panel)  # Changed to toggle_panel
                 widget.bind('<Enter>', self.on_tab_hover_enter)
                 widget.bind('<Leave>', self.on_tab_hover_leave)
             
-            # Start subtle pulse animation
-            self.start_tab_pulse()
+            # Subtle pulse animation, advanced by tick()
+            self.pulse_direction = 1
+            self.pulse_alpha = 0.85
+            self._tab_alive = True
             
             logger.info(f"Ribbon tab created at ({self.tab_x}, {self.tab_y})")
             
@@ -139,24 +317,14 @@ class RibbonIndicator:
             logger.error(f"Error creating ribbon tab: {str(e)}")
             raise
     
-    def start_tab_pulse(self):
-        """Subtle pulsing animation on the pull tab"""
-        self.pulse_direction = 1
-        self.pulse_alpha = 0.85
-        self.animate_tab_pulse()
-    
     def animate_tab_pulse(self):
         """Animate the tab pulsing"""
-        if not self.ribbon_window or not self.ribbon_window.winfo_exists():
+        if not self._tab_alive:
             return
             
         try:
-            if self.is_hovering or self.expanded:
-                self.ribbon_window.after(100, self.animate_tab_pulse)
-                return
-            
             # Gentle pulse between 0.6 and 0.85
-            self.pulse_alpha += self.pulse_direction * 0.02
+            self.pulse_alpha += self.pulse_direction * 0.04
             
             if self.pulse_alpha >= 0.85:
                 self.pulse_direction = -1
@@ -167,11 +335,8 @@ class RibbonIndicator:
                 self.ribbon_window.attributes('-alpha', self.pulse_alpha)
             except:
                 pass
-            
-            # Slower pulse - every 100ms
-            self.ribbon_window.after(100, self.animate_tab_pulse)
         except Exception as e:
-            logger.error(f"Error in tab pulse animation: {str(e)}")
+            logger.error("Error in tab pulse animation: %s", e)
     
     def on_tab_hover_enter(self, event=None):
         """Tab hover effect"""
@@ -239,12 +404,11 @@ class RibbonIndicator:
             self.animation_cancelled = False
             
             # Cancel auto-collapse timer immediately
-            if self.auto_collapse_timer:
-                self.ribbon_window.after_cancel(self.auto_collapse_timer)
-                self.auto_collapse_timer = None
+            self.auto_collapse_deadline = None
             
             # Start collapse animation
-            self.animate_collapse(self.panel_height)
+            self._anim_start = time.monotonic()
+            self.animate_collapse()
             
         except Exception as e:
             logger.error(f"Error collapsing panel: {str(e)}")
@@ -256,15 +420,12 @@ class RibbonIndicator:
             if not self.ribbon_window or not self.ribbon_window.winfo_exists():
                 return
                 
-            tab_frame = self.ribbon_window.winfo_children()[0]
-            tab_label = tab_frame.winfo_children()[0]
-            
             if active:
-                tab_frame.config(bg='#1E1E1E')  # Darker when active
-                tab_label.config(bg='#1E1E1E', text="🔺")  # Pin icon
+                self._tab_frame.config(bg='#1E1E1E')  # Darker when active
+                self._tab_label.config(bg='#1E1E1E', text="🔺")  # Pin icon
             else:
-                tab_frame.config(bg='#2F2F2F')
-                tab_label.config(bg='#2F2F2F', text="🔻")
+                self._tab_frame.config(bg='#2F2F2F')
+                self._tab_label.config(bg='#2F2F2F', text="🔻")
         except Exception as e:
             logger.error(f"Error updating tab appearance: {str(e)}")
     
@@ -279,7 +440,10 @@ class RibbonIndicator:
         try:
             # Create the panel window
             self.panel_window = tk.Toplevel(self.ribbon_window)
-            self.panel_window.geometry(f"{self.panel_width}x0+{self.panel_x}+{self.panel_y}")  # Start with 0 height
+            # Only the height changes while animating, so build the rest once
+            self._geo_prefix = f"{self.panel_width}x"
+            self._geo_suffix = f"+{self.panel_x}+{self.panel_y}"
+            self.panel_window.geometry(f"{self._geo_prefix}0{self._geo_suffix}")  # Start with 0 height
             self.panel_window.overrideredirect(True)
             self.panel_window.attributes('-topmost', True)
             
@@ -292,67 +456,73 @@ class RibbonIndicator:
             self.setup_modern_panel_content()
             
             # Animate the expansion
-            self.animate_expand(0)
+            self._anim_start = time.monotonic()
+            self.animate_expand()
             
         except Exception as e:
             logger.error(f"Error creating panel: {str(e)}")
             self.reset_animation_state()
     
-    def animate_expand(self, current_height):
+    def animate_expand(self):
         """Smooth expansion animation"""
         try:
             if self.animation_cancelled:
                 logger.info("Expand animation cancelled")
                 return
                 
-            target_height = self.panel_height
-            step = 4  # Height increase per frame
+            progress = (time.monotonic() - self._anim_start) / EXPAND_DURATION
             
-            if current_height < target_height:
-                current_height = min(current_height + step, target_height)
-                if self.panel_window and self.panel_window.winfo_exists():
-                    self.panel_window.geometry(f"{self.panel_width}x{current_height}+{self.panel_x}+{self.panel_y}")
+            if progress < 1.0:
+                current_height = int(progress * self.panel_height)
+                if self.panel_window:
+                    self.panel_window.geometry(f"{self._geo_prefix}{current_height}{self._geo_suffix}")
                 
                 # Continue animation
-                self.panel_window.after(15, lambda: self.animate_expand(current_height))
+                self.panel_window.after(ANIMATION_FRAME_MS, self.animate_expand)
             else:
+                if self.panel_window:
+                    self.panel_window.geometry(f"{self._geo_prefix}{self.panel_height}{self._geo_suffix}")
+                
                 # Animation complete
                 self.expanded = True
+                self._panel_alive = True
                 self.is_animating = False
-                self.start_timer_updates()
+                self.update_timer()
+                self._last_reset = None  # Always arm a freshly opened panel
                 self.reset_auto_collapse_timer()
                 logger.info("Panel expansion complete")
                 
         except Exception as e:
-            logger.error(f"Error in expand animation: {str(e)}")
+            logger.error("Error in expand animation: %s", e)
             self.reset_animation_state()
     
-    def animate_collapse(self, current_height):
+    def animate_collapse(self):
         """Smooth collapse animation"""
         try:
             if self.animation_cancelled:
                 logger.info("Collapse animation cancelled")
                 return
                 
-            step = 5  # Height decrease per frame
+            progress = (time.monotonic() - self._anim_start) / COLLAPSE_DURATION
             
-            if current_height > 0:
-                current_height = max(current_height - step, 0)
-                if self.panel_window and self.panel_window.winfo_exists():
-                    self.panel_window.geometry(f"{self.panel_width}x{current_height}+{self.panel_x}+{self.panel_y}")
+            if progress < 1.0:
+                current_height = int((1.0 - progress) * self.panel_height)
+                if self.panel_window:
+                    self.panel_window.geometry(f"{self._geo_prefix}{current_height}{self._geo_suffix}")
                 
                 # Continue animation
-                self.ribbon_window.after(10, lambda: self.animate_collapse(current_height))
+                self.ribbon_window.after(ANIMATION_FRAME_MS, self.animate_collapse)
             else:
                 # Animation complete - destroy panel and reset state
                 self.complete_collapse()
                 
         except Exception as e:
-            logger.error(f"Error in collapse animation: {str(e)}")
+            logger.error("Error in collapse animation: %s", e)
             self.complete_collapse()  # Ensure cleanup happens even on error
     
     def complete_collapse(self):
         """Complete the collapse operation and reset all state"""
+        self._panel_alive = False
         try:
             # Destroy panel window
             if self.panel_window:
@@ -374,7 +544,7 @@ class RibbonIndicator:
             logger.info("Panel collapsed successfully")
             
         except Exception as e:
-            logger.error(f"Error in complete_collapse: {str(e)}")
+            logger.error("Error in complete_collapse: %s", e)
             # Force reset state even if cleanup fails
             self.expanded = False
             self.is_animating = False
@@ -390,59 +560,49 @@ class RibbonIndicator:
             toolbar = tk.Frame(main_frame, bg='#1E1E1E')
             toolbar.pack(fill=tk.BOTH, expand=True, padx=12, pady=8)
             
-            # Left side - Timer section
-            timer_frame = tk.Frame(toolbar, bg='#1E1E1E')
-            timer_frame.pack(side=tk.LEFT, fill=tk.Y)
-            
-            # Timer icon and counter
-            timer_container = tk.Frame(timer_frame, bg='#1E1E1E')
-            timer_container.pack(side=tk.LEFT, pady=8)
+            # Widgets sit directly in the toolbar's grid, in columns:
+            # timer icon | timer | separator (absorbs spare width) | pulse | stop | collapse
+            toolbar.grid_rowconfigure(0, weight=1)
+            toolbar.grid_columnconfigure(2, weight=1)
             
             # Timer icon
             timer_icon = tk.Label(
-                timer_container, 
+                toolbar, 
                 text="T", 
                 bg='#1E1E1E', 
                 fg='white', 
                 font=('Segoe UI', 13, 'bold')
             )
-            timer_icon.pack(side=tk.LEFT, padx=(0, 6))
+            timer_icon.grid(row=0, column=0, padx=(0, 6))
             
             # Timer display
             self.timer_label = tk.Label(
-                timer_container, 
+                toolbar, 
                 text="00:00", 
                 bg='#1E1E1E', 
                 fg='white', 
                 font=('Segoe UI', 13, 'bold')
             )
-            self.timer_label.pack(side=tk.LEFT)
+            self.timer_label.grid(row=0, column=1)
+            self._last_time_str = "00:00"
             
             # Separator line
             separator = tk.Frame(toolbar, bg='#444444', width=1)
-            separator.pack(side=tk.LEFT, fill=tk.Y, padx=12)
-            
-            # Right side - Stop button section
-            button_frame = tk.Frame(toolbar, bg='#1E1E1E')
-            button_frame.pack(side=tk.RIGHT, fill=tk.Y)
-            
-            # Stop button container
-            stop_container = tk.Frame(button_frame, bg='#1E1E1E')
-            stop_container.pack(side=tk.RIGHT, pady=6)
+            separator.grid(row=0, column=2, sticky='nsw', padx=12)
             
             # Pulse indicator
             self.pulse_label = tk.Label(
-                stop_container,
+                toolbar,
                 text="●",  # Bullet point as pulse
                 bg='#1E1E1E',
                 fg='#FF5F57',
                 font=('Segoe UI', 8)
             )
-            self.pulse_label.pack(side=tk.LEFT, padx=(0, 4))
+            self.pulse_label.grid(row=0, column=3, padx=(0, 4))
             
             # Stop button
             self.stop_button = tk.Button(
-                stop_container,
+                toolbar,
                 text="Stop AI control",
                 bg='#3C3C3C',
                 fg='#FF5F57',
@@ -454,11 +614,11 @@ class RibbonIndicator:
                 command=self.stop_ai_control,
                 cursor='hand2'
             )
-            self.stop_button.pack(side=tk.LEFT)
+            self.stop_button.grid(row=0, column=4)
             
             # Collapse button (small X)
             collapse_button = tk.Button(
-                stop_container,
+                toolbar,
                 text="×",
                 bg='#1E1E1E',
                 fg='#666',
@@ -470,59 +630,36 @@ class RibbonIndicator:
                 command=self.collapse_panel,
                 cursor='hand2'
             )
-            collapse_button.pack(side=tk.RIGHT, padx=(8, 0))
+            collapse_button.grid(row=0, column=5, padx=(8, 0))
             
             # Add hover effects with safety checks
-            def on_stop_hover(e): 
-                try:
-                    if self.stop_button and self.stop_button.winfo_exists():
-                        self.stop_button.config(bg='#505050')
-                except:
-                    pass
-            def on_stop_leave(e): 
-                try:
-                    if self.stop_button and self.stop_button.winfo_exists():
-                        self.stop_button.config(bg='#3C3C3C')
-                except:
-                    pass
-            def on_collapse_hover(e): 
-                try:
-                    if collapse_button and collapse_button.winfo_exists():
-                        collapse_button.config(fg='white')
-                except:
-                    pass
-            def on_collapse_leave(e): 
-                try:
-                    if collapse_button and collapse_button.winfo_exists():
-                        collapse_button.config(fg='#666')
-                except:
-                    pass
+            stop_button = self.stop_button
+            stop_button.bind('<Enter>', lambda e: self._safe_config(stop_button, bg='#505050'))
+            stop_button.bind('<Leave>', lambda e: self._safe_config(stop_button, bg='#3C3C3C'))
+            collapse_button.bind('<Enter>', lambda e: self._safe_config(collapse_button, fg='white'))
+            collapse_button.bind('<Leave>', lambda e: self._safe_config(collapse_button, fg='#666'))
             
-            self.stop_button.bind('<Enter>', on_stop_hover)
-            self.stop_button.bind('<Leave>', on_stop_leave)
-            collapse_button.bind('<Enter>', on_collapse_hover)
-            collapse_button.bind('<Leave>', on_collapse_leave)
-            
-            # Start pulse animation for the pulse indicator
-            self.start_pulse_animation()
+            # The pulse indicator starts lit; tick() blinks it
+            self.pulse_visible = False
             
             # Bind panel events for auto-collapse reset
-            self.panel_window.bind('<Enter>', lambda e: self.reset_auto_collapse_timer())
-            self.panel_window.bind('<Motion>', lambda e: self.reset_auto_collapse_timer())
+            self.panel_window.bind('<Enter>', self.reset_auto_collapse_timer)
+            self.panel_window.bind('<Motion>', self.reset_auto_collapse_timer)
             
         except Exception as e:
             logger.error(f"Error setting up panel content: {str(e)}")
     
-    def start_pulse_animation(self):
-        """Start the pulse animation for the indicator"""
-        self.pulse_visible = True
-        self.animate_pulse()
+    def _safe_config(self, widget, **kwargs):
+        """Configure a widget, ignoring one that has already been destroyed"""
+        try:
+            if widget.winfo_exists():
+                widget.config(**kwargs)
+        except Exception:
+            pass
     
     def animate_pulse(self):
         """Animate the pulse indicator"""
-        if (self.pulse_label and self.expanded and 
-            self.panel_window and self.panel_window.winfo_exists() and
-            self.pulse_label.winfo_exists()):
+        if self._panel_alive and self.pulse_label and self.expanded:
             try:
                 # Toggle visibility for pulse effect
                 if self.pulse_visible:
@@ -531,46 +668,37 @@ class RibbonIndicator:
                     self.pulse_label.config(fg='#AA3E39')  # Darker red for dimmed state
                 
                 self.pulse_visible = not self.pulse_visible
-                
-                # Schedule next pulse
-                self.panel_window.after(750, self.animate_pulse)  # 1.5s cycle / 2
             except Exception as e:
-                logger.error(f"Error in pulse animation: {str(e)}")
-    
-    def start_timer_updates(self):
-        """Start updating the timer display"""
-        self.update_timer()
+                logger.error("Error in pulse animation: %s", e)
     
     def update_timer(self):
         """Update the timer display"""
-        if (self.timer_label and self.expanded and 
-            self.panel_window and self.panel_window.winfo_exists() and
-            self.timer_label.winfo_exists()):
+        if self._panel_alive and self.timer_label and self.expanded:
             try:
-                elapsed = int(time.time() - self.start_time)
-                minutes = elapsed // 60
-                seconds = elapsed % 60
+                minutes, seconds = divmod(int(time.time() - self.start_time), 60)
                 time_str = f"{minutes:02d}:{seconds:02d}"
-                self.timer_label.config(text=time_str)
-                
-                # Schedule next update
-                self.panel_window.after(1000, self.update_timer)
+                # Only touch the label when the text actually changes
+                if time_str != self._last_time_str:
+                    self.timer_label.config(text=time_str)
+                    self._last_time_str = time_str
             except Exception as e:
-                logger.error(f"Error updating timer: {str(e)}")
+                logger.error("Error updating timer: %s", e)
     
-    def reset_auto_collapse_timer(self):
+    def reset_auto_collapse_timer(self, event=None):
         """Reset the auto-collapse timer"""
         if not self.expanded:
             return
+        
+        # <Motion> fires for every pixel; a deadline re-armed moments ago is fine
+        if self._last_reset is not None and self.tick_count - self._last_reset < COLLAPSE_RESET_TICKS:
+            return
+        self._last_reset = self.tick_count
             
         try:
-            if self.auto_collapse_timer:
-                self.ribbon_window.after_cancel(self.auto_collapse_timer)
-            
-            # Auto collapse after 20 seconds
-            self.auto_collapse_timer = self.ribbon_window.after(20000, self.collapse_panel)
+            # Auto collapse after 20 seconds; tick() checks the deadline
+            self.auto_collapse_deadline = self.tick_count + AUTO_COLLAPSE_TICKS
         except Exception as e:
-            logger.error(f"Error resetting auto-collapse timer: {str(e)}")
+            logger.error("Error resetting auto-collapse timer: %s", e)
     
     def stop_ai_control(self):
         """Stop AI control via API"""
@@ -588,7 +716,7 @@ class RibbonIndicator:
             
             def call_stop_api():
                 try:
-                    response = requests.get(f"{self.server_url}/indicator/stop", timeout=10, headers={'Accept': 'application/json'})
+                    response = _http_session.get(f"{self.server_url}/indicator/stop", timeout=STOP_API_TIMEOUT)
                     
                     if response.status_code == 200:
                         data = response.json()
@@ -626,26 +754,35 @@ class RibbonIndicator:
                             pass
                     self.ribbon_window.after(0, reset_button)
             
-            threading.Thread(target=call_stop_api, daemon=True).start()
+            _api_pool.submit(call_stop_api)
             
         except Exception as e:
             logger.error(f"Error in stop button handler: {str(e)}")
     
     def show(self):
         """Show the ribbon tab"""
+        # tick_job and the windows are only touched on the Tk thread
+        self._on_tk_thread(self._show)
+    
+    def _show(self):
         try:
             if self.ribbon_window:
                 self.ribbon_window.deiconify()
                 self.ribbon_window.lift()
+                self.start_ticker()
                 logger.info("Ribbon tab shown")
         except Exception as e:
             logger.error(f"Error showing ribbon tab: {str(e)}")
     
     def hide(self):
         """Hide the ribbon tab"""
+        self._on_tk_thread(self._hide)
+    
+    def _hide(self):
         try:
             # Cancel any ongoing animation
             self.animation_cancelled = True
+            self._panel_alive = False
             
             if self.panel_window:
                 self.panel_window.destroy()
@@ -656,6 +793,8 @@ class RibbonIndicator:
             self.is_animating = False
             
             if self.ribbon_window:
+                # Nothing periodic is needed while the tab is hidden
+                self.stop_ticker()
                 self.ribbon_window.withdraw()
                 logger.info("Ribbon tab hidden")
         except Exception as e:
@@ -665,10 +804,15 @@ class RibbonIndicator:
         """Destroy the ribbon tab"""
         try:
             self.animation_cancelled = True
+            self._panel_alive = False
+            self._tab_alive = False
             if self.panel_window:
                 self.panel_window.destroy()
+                self.panel_window = None
             if self.ribbon_window:
+                self.stop_ticker()
                 self.ribbon_window.destroy()
+            self._root.destroy()
             logger.info("Ribbon tab destroyed")
         except Exception as e:
             logger.error(f"Error destroying ribbon tab: {str(e)}")
@@ -676,42 +820,39 @@ class RibbonIndicator:
 # Global window reference
 _indicator_window = None
 _window_thread = None
-
-def auto_hide_after_timeout(timeout_seconds=15.0):
-    """Automatically hide the indicator after inactivity"""
-    global indicator_active, control_start_time
-    
-    if globals().get('STANDALONE_TEST_MODE', False):
-        logger.info("Auto-hide disabled in standalone test mode")
-        while True:
-            time.sleep(60)
-    
-    while True:
-        time.sleep(1.0)
-        try:
-            if indicator_active and control_start_time:
-                elapsed = time.time() - control_start_time
-                if elapsed > timeout_seconds:
-                    logger.info(f"Auto-hiding indicator after {elapsed:.1f}s of inactivity")
-                    hide_indicator()
-                    control_start_time = time.time()
-        except Exception as e:
-            logger.error(f"Error in auto-hide thread: {str(e)}")
+_ready = threading.Event()  # Set once the indicator exists on its Tk thread
+INDICATOR_READY_TIMEOUT = 2.0
 
 def initialize_indicator(server_port=5000):
     """Initialize the ribbon indicator"""
     global _indicator_window, _window_thread
     try:
-        if _indicator_window is None:
+        if _window_thread is None:
+            _ready.clear()
             def create_window():
-                global _indicator_window
-                _indicator_window = RibbonIndicator(server_port)
-                _indicator_window.hide()  # Start hidden
+                global _indicator_window, _window_thread
+                try:
+                    _indicator_window = RibbonIndicator(server_port)
+                    _indicator_window.hide()  # Start hidden
+                except Exception as e:
+                    logger.error(f"Error creating ribbon indicator: {str(e)}")
+                    # Let the next call start a fresh Tk thread
+                    _indicator_window = None
+                    _window_thread = None
+                    return
+                finally:
+                    # Wake the caller on failure too, instead of letting it time out
+                    _ready.set()
                 _indicator_window.ribbon_window.mainloop()
             
             _window_thread = threading.Thread(target=create_window, daemon=True)
             _window_thread.start()
-            time.sleep(0.5)
+        
+        # Returns as soon as the Tk thread has built the window or given up
+        if not _ready.wait(timeout=INDICATOR_READY_TIMEOUT):
+            logger.warning("Timed out waiting for the ribbon indicator window")
+        if _indicator_window is None:
+            return False
             
         logger.info(f"Ribbon indicator initialized (server port: {server_port})")
         return True
@@ -724,9 +865,8 @@ def toggle_indicator(show=True, server_port=5000):
     global indicator_active, control_start_time, _indicator_window
     
     try:
-        if _indicator_window is None:
-            initialize_indicator(server_port)
-            time.sleep(0.5)
+        if _indicator_window is None and not initialize_indicator(server_port):
+            return indicator_active
         
         if show and not indicator_active:
             _indicator_window.show()
@@ -767,16 +907,12 @@ def force_refresh_timer():
 
 def get_activity_timeout():
     """Get activity timeout"""
-    return 15.0
+    return ACTIVITY_TIMEOUT
 
 def is_indicator_visible():
     """Check if indicator is visible"""
     return indicator_active
 
-# Start auto-hide thread
-auto_hide_thread = threading.Thread(target=auto_hide_after_timeout, daemon=True)
-auto_hide_thread.start()
-
 # For testing
 if __name__ == "__main__":
     STANDALONE_TEST_MODE = True
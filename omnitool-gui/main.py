@@ -1,6 +1,9 @@
 """main.py"""
 import os
 import logging
+import logging.handlers
+import atexit
+import queue
 import argparse
 import shlex
 import subprocess
@@ -15,10 +18,27 @@ import uuid
 import json
 import time
 import requests
+from requests.adapters import HTTPAdapter
 from indicator_window import initialize_indicator, toggle_indicator, get_status
 
+# mss grabs the desktop straight into one buffer; pyautogui is the fallback
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+# orjson encodes/decodes in C; needs Flask >= 2.2 for pluggable JSON providers
+try:
+    import orjson
+    from flask.json.provider import DefaultJSONProvider
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Define default paths in ProgramData
-USER_DOCS = os.path.join(os.path.expanduser('~'), 'Documents')
+HOME_DIR = os.path.expanduser('~')
+USER_DOCS = os.path.join(HOME_DIR, 'Documents')
 PROGRAM_DATA_DIR = os.path.join(os.path.join(USER_DOCS, 'HevolveAi Agent Companion'))
 DEFAULT_LOG_DIR = os.path.join(PROGRAM_DATA_DIR, 'logs')
 DEFAULT_LOG_FILE = os.path.join(DEFAULT_LOG_DIR, 'server.log')
@@ -29,11 +49,27 @@ DEFAULT_USER_DATA_FILE = os.path.join(DEFAULT_STORAGE_DIR, 'user_data.json')
 # Default API Endpoint 
 DEFAULT_STOP_API_URL = "http://gcp_training2.hertzai.com:5001/stop" 
 
+# Shared session so repeated stop requests reuse a keep-alive connection
+# instead of paying a new TCP handshake each time
+STOP_SESSION = requests.Session()
+STOP_SESSION.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0))
+STOP_SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0))
+STOP_SESSION.headers.update({"Content-Type": "application/json"})
+
 # Setting global variables to track LLM Control Status
 llm_control_active = False
 last_activity_time = 0
 ACTIVITY_TIMEOUT = 15.0 # Seconds before considering control inactive
 
+# /execute swaps these interpreters for the embedded Python when running -c/-m
+PYTHON_COMMANDS = frozenset(("python", "python3"))
+PYTHON_INLINE_FLAGS = frozenset(("-c", "-m"))
+
+# Screenshot encodings: JPEG by default (far smaller, cheaper to encode),
+# PNG with fast zlib settings when the caller asks for ?format=png
+SCREENSHOT_JPEG_QUALITY = 80
+SCREENSHOT_PNG_COMPRESS_LEVEL = 1
+
 parser = argparse.ArgumentParser()
 parser.add_argument("--log_file", help="log file path", type=str,
                     default=DEFAULT_LOG_FILE)
@@ -46,55 +82,58 @@ args = parser.parse_args()
 
 # Ensure log directory exists
 log_dir = os.path.dirname(args.log_file)
-if not os.path.exists(log_dir):
-    try:
-        os.makedirs(log_dir, exist_ok=True)
-    except Exception as e:
-        # If there's an error creating the log directory, fall back to temporary directory
-        temp_log_dir = os.path.join(os.environ.get('TEMP', 'C:\\Temp'), 'OmniParser')
-        os.makedirs(temp_log_dir, exist_ok=True)
-        args.log_file = os.path.join(temp_log_dir, 'server.log')
-        print(f"Failed to create log directory {log_dir}: {str(e)}. Using {args.log_file} instead.")
+try:
+    os.makedirs(log_dir, exist_ok=True)
+except Exception as e:
+    # If there's an error creating the log directory, fall back to temporary directory
+    temp_log_dir = os.path.join(os.environ.get('TEMP', 'C:\\Temp'), 'OmniParser')
+    os.makedirs(temp_log_dir, exist_ok=True)
+    args.log_file = os.path.join(temp_log_dir, 'server.log')
+    print(f"Failed to create log directory {log_dir}: {str(e)}. Using {args.log_file} instead.")
 
 # Ensure device_id directory exists
 device_id_dir = os.path.dirname(args.device_id_file)
-if not os.path.exists(device_id_dir):
-    try:
-        os.makedirs(device_id_dir, exist_ok=True)
-    except Exception as e:
-        # If there's an error creating the device ID directory, fall back to app directory
-        args.device_id_file = os.path.join(os.path.dirname(__file__), 'device_id.json')
-        print(f"Failed to create device ID directory {device_id_dir}: {str(e)}. Using {args.device_id_file} instead.")
-
-# Configure logging
 try:
-    logging.basicConfig(
-        filename=args.log_file,
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        filemode='a'
-    )
+    os.makedirs(device_id_dir, exist_ok=True)
 except Exception as e:
-    # If we can't write to the log file, use a temporary file
-    temp_log_file = os.path.join(os.environ.get('TEMP', 'C:\\Temp'), 'OmniParser', 'server.log')
-    os.makedirs(os.path.dirname(temp_log_file), exist_ok=True)
-    logging.basicConfig(
-        filename=temp_log_file,
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        filemode='a'
-    )
-    print(f"Failed to use log file {args.log_file}: {str(e)}. Using {temp_log_file} instead.")
+    # If there's an error creating the device ID directory, fall back to app directory
+    args.device_id_file = os.path.join(os.path.dirname(__file__), 'device_id.json')
+    print(f"Failed to create device ID directory {device_id_dir}: {str(e)}. Using {args.device_id_file} instead.")
+
+def setup_logging():
+    """Log to args.log_file and the console through a background QueueListener"""
+    log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        file_handler = logging.FileHandler(args.log_file, mode='a')
+    except Exception as e:
+        # If we can't write to the log file, use a temporary file
+        temp_log_file = os.path.join(os.environ.get('TEMP', 'C:\\Temp'), 'OmniParser', 'server.log')
+        os.makedirs(os.path.dirname(temp_log_file), exist_ok=True)
+        file_handler = logging.FileHandler(temp_log_file, mode='a')
+        print(f"Failed to use log file {args.log_file}: {str(e)}. Using {temp_log_file} instead.")
+    file_handler.setFormatter(log_formatter)
+
+    # Add a console handler for when running interactively
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(log_formatter)
+
+    # Request threads only enqueue records; the listener thread does the I/O
+    log_queue = queue.SimpleQueue()
+    log_listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True)
+    logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(log_queue)])
+    log_listener.start()
+    atexit.register(log_listener.stop)
+
+# Configure logging, unless the process already has (app.py imports this
+# module after setting up its own queue listener, which then handles ours too)
+if not logging.getLogger().handlers:
+    setup_logging()
 
 logger = logging.getLogger('werkzeug')
 logger.setLevel(logging.INFO)
 
-# Add a console handler for when running interactively
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
-console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-logging.getLogger().addHandler(console_handler)
-
 logging.info(f"Starting OmniParser Computer Control server on port {args.port}")
 logging.info(f"Using log file: {args.log_file}")
 logging.info(f"Using device ID file: {args.device_id_file}")
@@ -111,19 +150,48 @@ def initialize_indicator_window():
     except Exception as e:
         logger.error(f"Error initializing indicator: {str(e)}")
         
-app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    class OrjsonProvider(DefaultJSONProvider):
+        """Flask JSON provider backed by orjson, for jsonify and request.json"""
 
-computer_control_lock = threading.Lock()
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
+
+# Commands run one at a time on a single worker thread. Synchronous
+# /execute calls wait for their job; async ones get a job id and poll
+# /execute/<job_id>, which hands the result over once and forgets it.
+# Results nobody collects are dropped JOB_RESULT_TTL seconds after finishing.
+JOB_Q = queue.Queue()
+JOBS = {}
+JOBS_LOCK = threading.Lock()
+JOB_RESULT_TTL = 600.0
+
+def evict_expired_jobs():
+    """Forget finished async jobs whose result was never collected"""
+    cutoff = time.time() - JOB_RESULT_TTL
+    with JOBS_LOCK:
+        expired = [job_id for job_id, job in JOBS.items()
+                   if job['finished'] is not None and job['finished'] < cutoff]
+        for job_id in expired:
+            del JOBS[job_id]
 
 # Function to get or create a persistent device ID
 def get_device_id():
-    if os.path.exists(args.device_id_file):
-        try:
-            with open(args.device_id_file, 'r') as f:
-                data = json.load(f)
-                return data.get('device_id')
-        except Exception as e:
-            logging.error(f"Error reading device ID file: {str(e)}")
+    try:
+        with open(args.device_id_file, 'r') as f:
+            data = json.load(f)
+            return data.get('device_id')
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.error(f"Error reading device ID file: {str(e)}")
     
     # Generate a new device ID if it doesn't exist
     device_id = str(uuid.uuid4())
@@ -139,6 +207,37 @@ def get_device_id():
     return device_id
 
 
+# The process's one cache of user_data.json; app.py reads and writes
+# through these functions too
+_user_data_cache = None  # (st_mtime_ns, parsed dict)
+_user_data_lock = threading.Lock()
+
+def cache_user_data(user_data, mtime_ns):
+    """Remember user_data as the contents of user_data.json at mtime_ns"""
+    global _user_data_cache
+    with _user_data_lock:
+        _user_data_cache = (mtime_ns, user_data)
+
+def load_user_data():
+    """Return the parsed user_data.json, re-reading it only when its mtime changes.
+
+    Raises FileNotFoundError if the file doesn't exist.
+    """
+    mtime_ns = os.stat(DEFAULT_USER_DATA_FILE).st_mtime_ns
+    with _user_data_lock:
+        cached = _user_data_cache
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+
+    with open(DEFAULT_USER_DATA_FILE, 'rb') as f:
+        data = f.read()
+    user_data = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+    # Keyed on the mtime seen before reading: if the file was replaced since,
+    # the next call sees a different mtime and reads it again
+    cache_user_data(user_data, mtime_ns)
+    return user_data
+
+
 def call_stop_api():
     """
     Call the handle_stop_request API endpoint using HTTP
@@ -150,28 +249,26 @@ def call_stop_api():
         try:
             stop_payload = {}
 
-            if os.path.exists(DEFAULT_USER_DATA_FILE):
-                try:
-                    with open(DEFAULT_USER_DATA_FILE, 'r') as f:
-                        user_data = json.load(f)
-                        user_id = user_data.get('user_id')
-
-                        if user_id:
-                            # Add the user_id to payload regardless if we've prompt_id or not
-                            stop_payload['user_id'] = user_id
-
-                            # if we've prompt_id, include it too
-                            prompt_id = user_data.get('prompt_id')
-                            if prompt_id:
-                                stop_payload['prompt_id'] = prompt_id
-                                logger.info(f"Using speific stop for user_id={user_id}, prompt_id={prompt_id}")
-                            else:
-                                logger.info(f"Using user-specific stop for user_id={user_id}")
-                
-                except Exception as e:
-                    logger.error(f"Error reading user data: {str(e)}")
-            else:
+            try:
+                user_data = load_user_data()
+                user_id = user_data.get('user_id')
+
+                if user_id:
+                    # Add the user_id to payload regardless if we've prompt_id or not
+                    stop_payload['user_id'] = user_id
+
+                    # if we've prompt_id, include it too
+                    prompt_id = user_data.get('prompt_id')
+                    if prompt_id:
+                        stop_payload['prompt_id'] = prompt_id
+                        logger.info(f"Using speific stop for user_id={user_id}, prompt_id={prompt_id}")
+                    else:
+                        logger.info(f"Using user-specific stop for user_id={user_id}")
+            
+            except FileNotFoundError:
                 logger.info("No user data file found, using global stop")
+            except Exception as e:
+                logger.error(f"Error reading user data: {str(e)}")
         except Exception as e:
                 logger.error(f"Error preparing stop payload: {str(e)}")
                 stop_payload = {}
@@ -180,10 +277,9 @@ def call_stop_api():
         # Make the API Call
         logger.info(f"Calling the stop API at {args.stop_api_url} with payload: {stop_payload}")
 
-        response = requests.post(
+        response = STOP_SESSION.post(
             args.stop_api_url,
             json=stop_payload,
-            headers={"Content-Type": "application/json"},
             timeout=10.0
         )
 
@@ -216,8 +312,18 @@ logging.info(f"Device ID: {DEVICE_ID}")
 def probe_endpoint():
     return jsonify({"status": "Probe successful", "message": "Service is operational"}), 200
 
+_embedded_python_path = None  # Set once the embedded Python has been found
+
 def get_embedded_python_path():
-    """Get the path to the embedded Python executable"""
+    """Get the path to the embedded Python executable.
+
+    A found path is remembered; a miss is re-checked next time, so an
+    embedded Python installed while the server runs is still picked up.
+    """
+    global _embedded_python_path
+    if _embedded_python_path is not None:
+        return _embedded_python_path
+
     if getattr(sys, 'frozen', False):
         # Running as frozen executable
         base_dir = os.path.dirname(sys.executable)
@@ -229,6 +335,7 @@ def get_embedded_python_path():
     embedded_python = os.path.join(base_dir, "python-embed", "python.exe")
     if os.path.exists(embedded_python):
         logging.info(f"Found embedded Python at: {embedded_python}")
+        _embedded_python_path = embedded_python
         return embedded_python
     
     logging.warning("Embedded Python not found, will use system Python")
@@ -236,132 +343,204 @@ def get_embedded_python_path():
 
 @app.route('/execute', methods=['POST'])
 def execute_command():
-    # Only execute one command at a time
-    with computer_control_lock:
-        global llm_control_active, last_activity_time
+    global llm_control_active, last_activity_time
 
-        # set control as active and update timestamp
-        llm_control_active = True
+    # set control as active and update timestamp
+    llm_control_active = True
+    last_activity_time = time.time()
+
+    # Show the indicator window; activity_monitor hides it again after inactivity
+    toggle_indicator(True)
+
+    data = request.json
+    # The 'command' key in the JSON request should contain the command to be executed.
+    shell = data.get('shell', False)
+    command = data.get('command', "" if shell else [])
+    hide_window = data.get('hide_window', True) # To hide the cmd pop up
+
+    if isinstance(command, str) and not shell:
+        command = shlex.split(command)
+
+    # Log the command being executed
+    logging.info(f"Executing command: {command}")
+
+    # Check if this is a Python command that we should intercept
+    if (not shell and len(command) >= 2 and isinstance(command[0], str) and
+        command[0] in PYTHON_COMMANDS and
+        any(arg in PYTHON_INLINE_FLAGS for arg in command[1:] if isinstance(arg, str))):
+        # Try to use embedded Python
+        embedded_python = get_embedded_python_path()
+        if embedded_python:
+            # Replace the python command with embedded Python
+            logging.info(f"Replacing system Python with embedded Python: {embedded_python}")
+            command[0] = embedded_python
+
+    # Expand user directory (same result as os.path.expanduser for "~/...")
+    if isinstance(command, list):
+        for i, arg in enumerate(command):
+            if isinstance(arg, str) and arg.startswith("~/"):
+                command[i] = HOME_DIR + arg[1:]
+
+    job = {'args': (command, shell, hide_window), 'done': threading.Event(),
+           'result': None, 'finished': None}
+    if data.get('async', False):
+        evict_expired_jobs()
+        job_id = uuid.uuid4().hex
+        with JOBS_LOCK:
+            JOBS[job_id] = job
+        JOB_Q.put(job)
+        return jsonify({'status': 'queued', 'job_id': job_id}), 202
+
+    JOB_Q.put(job)
+    job['done'].wait()
+    body, status_code = job['result']
+    return jsonify(body), status_code
+
+@app.route('/execute/<job_id>', methods=['GET'])
+def execute_result(job_id):
+    """Return the result of an async /execute job, or its pending status"""
+    with JOBS_LOCK:
+        job = JOBS.get(job_id)
+        if job is not None and job['done'].is_set():
+            # Only one poller gets the result; later ones see an unknown id
+            job = JOBS.pop(job_id, None)
+            finished = True
+        else:
+            finished = False
+    if job is None:
+        return jsonify({'status': 'error', 'message': f'Unknown job id: {job_id}'}), 404
+    if not finished:
+        return jsonify({'status': 'pending', 'job_id': job_id})
+
+    body, status_code = job['result']
+    return jsonify(body), status_code
+
+def run_command(command, shell, hide_window):
+    """Run one command and return the response body and HTTP status code"""
+    # Execute the command without any safety checks.
+    try:
+        # Set up process creation flags for Windows to hide window
+        startupinfo = None
+        creation_flags = 0
+
+        if sys.platform == "win32" and hide_window:
+            # CREATE_NO_WINDOW flag (0x08000000) to prevent window from showing
+            creation_flags = 0x08000000
+
+            # Also set up STARTUPINFO to hide the window
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = 0 # SW_HIDE
+
+        # env=None: the child inherits this process's environment as is,
+        # without copying os.environ and rebuilding it for every command
+        result = subprocess.run(
+            command, 
+            stdout=subprocess.PIPE, 
+            stderr=subprocess.PIPE, 
+            shell=shell, 
+            text=True, 
+            timeout=120, 
+            env=None, 
+            startupinfo=startupinfo, 
+            creationflags=creation_flags)
+        logging.info(f"Command executed with return code: {result.returncode}")
+        
+        return {
+            'status': 'success',
+            'output': result.stdout,
+            'error': result.stderr,
+            'returncode': result.returncode
+        }, 200
+    except Exception as e:
+        logger.error("Command execution error: "+ traceback.format_exc())
+        return {
+            'status': 'error',
+            'message': str(e)
+        }, 500
+
+def command_worker():
+    """Run queued /execute jobs in order"""
+    global last_activity_time
+    while True:
+        job = JOB_Q.get()
+        job['result'] = run_command(*job['args'])
+        job['finished'] = time.time()
+
+        # After executing the command, update the timestamp again to extend the indicator display
         last_activity_time = time.time()
+        job['done'].set()
 
-        # Show the indicator window
-        toggle_indicator(True)
+threading.Thread(target=command_worker, daemon=True, name='command-worker').start()
 
-        # Start a timeout thread to automatically reset status after inactivity
-        def reset_after_timeout():
-            global llm_control_active, last_activity_time
-            time.sleep(ACTIVITY_TIMEOUT + 0.1)  # Add small buffer
-            if (time.time() - last_activity_time) > ACTIVITY_TIMEOUT:
-                llm_control_active = False
-                toggle_indicator(False)
-        
-        timeout_thread = threading.Thread(target=reset_after_timeout, daemon=True)
-        timeout_thread.start()
-
-        data = request.json
-        # The 'command' key in the JSON request should contain the command to be executed.
-        shell = data.get('shell', False)
-        command = data.get('command', "" if shell else [])
-        hide_window = data.get('hide_window', True) # To hide the cmd pop up
-
-        if isinstance(command, str) and not shell:
-            command = shlex.split(command)
-
-        # Log the command being executed
-        logging.info(f"Executing command: {command}")
-
-        # Check if this is a Python command that we should intercept
-        if (not shell and len(command) >= 2 and 
-            (command[0] == "python" or command[0] == "python3") and 
-            ("-c" in command or "-m" in command)):
-            # Try to use embedded Python
-            embedded_python = get_embedded_python_path()
-            if embedded_python:
-                # Replace the python command with embedded Python
-                logging.info(f"Replacing system Python with embedded Python: {embedded_python}")
-                command[0] = embedded_python
-
-        # Expand user directory
-        for i, arg in enumerate(command):
-            if isinstance(arg, str) and arg.startswith("~/"):
-                command[i] = os.path.expanduser(arg)
+def activity_monitor():
+    """Reset the control status once no command has run for ACTIVITY_TIMEOUT"""
+    global llm_control_active
+    while True:
+        time.sleep(1.0)
+        if llm_control_active and (time.time() - last_activity_time) > ACTIVITY_TIMEOUT:
+            llm_control_active = False
+            toggle_indicator(False)
 
-        # Execute the command without any safety checks.
-        try:
-            # Set up process creation flags for Windows to hide window
-            startupinfo = None
-            creation_flags = 0
-
-            if sys.platform == "win32" and hide_window:
-                # Import the necessary modules ofr windows
-                import subprocess
-
-                # CREATE_NO_WINDOW flag (0x08000000) to prevent window from showing
-                creation_flags = 0x08000000
-
-                # Also set up STARTUPINFO to hide the window
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = 0 # SW_HIDE
-
-            # Add environment variables
-            env = os.environ.copy()
-            result = subprocess.run(
-                command, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE, 
-                shell=shell, 
-                text=True, 
-                timeout=120, 
-                env=env, 
-                startupinfo=startupinfo, 
-                creationflags=creation_flags)
-            logging.info(f"Command executed with return code: {result.returncode}")
-
-            # After executing the command, update the timestamp again to extend the indicator display
-            last_activity_time = time.time()
-            
-            return jsonify({
-                'status': 'success',
-                'output': result.stdout,
-                'error': result.stderr,
-                'returncode': result.returncode
-            })
-        except Exception as e:
-            logger.error("Command execution error: "+ traceback.format_exc())
-            return jsonify({
-                'status': 'error',
-                'message': str(e)
-            }), 500
+threading.Thread(target=activity_monitor, daemon=True, name='activity-monitor').start()
+
+def load_cursor_image():
+    """Load the cursor overlay once, already shrunk for pasting; None if unavailable"""
+    cursor_path = os.path.join(os.path.dirname(__file__), "cursor.png")
+
+    # Check if cursor.png exists
+    if not os.path.exists(cursor_path):
+        logging.warning(f"Cursor image not found at {cursor_path}")
+        return None
+
+    try:
+        cursor = Image.open(cursor_path).convert("RGBA")
+        # make the cursor smaller; the glyph is tiny, so bilinear is plenty
+        return cursor.resize((int(cursor.width / 1.5), int(cursor.height / 1.5)), Image.BILINEAR)
+    except Exception as e:
+        logging.error(f"Failed to process cursor image: {str(e)}")
+        return None
+
+CURSOR_IMAGE = load_cursor_image()
+
+# mss keeps per-thread device contexts, so each server thread gets its own
+_capture_local = threading.local()
+
+def grab_screen():
+    """Capture the primary monitor as an RGB PIL image"""
+    if not MSS_AVAILABLE:
+        return pyautogui.screenshot()
+
+    sct = getattr(_capture_local, 'sct', None)
+    if sct is None:
+        sct = _capture_local.sct = mss.mss()
+    raw = sct.grab(sct.monitors[1])
+    return Image.frombytes("RGB", raw.size, raw.bgra, "raw", "BGRX")
 
 @app.route('/screenshot', methods=['GET'])
 def capture_screen_with_cursor():    
     try:
-        cursor_path = os.path.join(os.path.dirname(__file__), "cursor.png")
+        screenshot = grab_screen()
 
-        # Check if cursor.png exists
-        if not os.path.exists(cursor_path):
-            logging.warning(f"Cursor image not found at {cursor_path}")
-            screenshot = pyautogui.screenshot()
-        else:
-            # Take screenshot and overlay cursor
-            screenshot = pyautogui.screenshot()
+        if CURSOR_IMAGE is not None:
+            # Overlay the cursor at its current position
             cursor_x, cursor_y = pyautogui.position()
+            screenshot.paste(CURSOR_IMAGE, (cursor_x, cursor_y), CURSOR_IMAGE)
 
-            try:
-                cursor = Image.open(cursor_path)
-                # make the cursor smaller
-                cursor = cursor.resize((int(cursor.width / 1.5), int(cursor.height / 1.5)))
-                screenshot.paste(cursor, (cursor_x, cursor_y), cursor)
-            except Exception as e:
-                logging.error(f"Failed to process cursor image: {str(e)}")
-    
 
         # Convert PIL Image to bytes and send
         img_io = BytesIO()
-        screenshot.save(img_io, 'PNG')
+        if request.args.get('format', 'jpeg').lower() == 'png':
+            screenshot.save(img_io, 'PNG', compress_level=SCREENSHOT_PNG_COMPRESS_LEVEL)
+            mimetype = 'image/png'
+        else:
+            if screenshot.mode != 'RGB':
+                screenshot = screenshot.convert('RGB')
+            screenshot.save(img_io, 'JPEG', quality=SCREENSHOT_JPEG_QUALITY, subsampling=2)
+            mimetype = 'image/jpeg'
         img_io.seek(0)
-        return send_file(img_io, mimetype='image/png')
+        # Every screenshot is fresh: skip Range/If-* handling and caching
+        return send_file(img_io, mimetype=mimetype, max_age=0, conditional=False)
     except Exception as e:
         logging.error("Screenshot error: "+ traceback.format_exc())
         return jsonify({
@@ -439,9 +618,13 @@ if __name__ == '__main__':
         logging.info(f"Python version: {sys.version}")
         logging.info(f"Running from: {os.path.abspath(__file__)}")
 
-        # Start the server
+        # Start the server. waitress serves requests from a thread pool, so
+        # status polls and screenshots aren't queued behind a long /execute
+        # (commands themselves run one at a time on the command worker)
+        from waitress import serve
         logging.info(f"Starting Flask server on port {args.port}")
-        app.run(debug=False, host="0.0.0.0", port=args.port)
+        serve(app, host="0.0.0.0", port=args.port, threads=8,
+              connection_limit=256, channel_timeout=120)
     except Exception as e:
         logging.critical(f"Failed to start server: {str(e)}")
         logging.critical(traceback.format_exc())
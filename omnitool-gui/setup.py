@@ -12,7 +12,6 @@ setup(
         "pywebview>=4.1.0",
         "pyautogui>=0.9.52",
         "pillow>=9.0.0",
-        "flask-cors>=3.0.10",
     ],
     entry_points={
         "console_scripts": [
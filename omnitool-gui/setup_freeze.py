@@ -115,8 +115,9 @@ build_exe_options = {
         "pathlib",
         "shutil",
         "winreg",
-        "flask_cors",
         "pyautogui",
+        "mss",
+        "orjson",
         "PIL",
         "io",
         "uuid",